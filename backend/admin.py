@@ -1,12 +1,23 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt
+import json
+
+import numpy as np
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from functools import wraps
-from backend.db import SessionLocal
-from backend.models import User, Profile, Item
-from backend.rules import score_item, pick_outfit
+from backend import metrics, user_cache
+from sqlalchemy import select
+from backend.db import db_session
+from backend.items import MAX_LIMIT, STREAM_CHUNK
+from backend.request_args import int_arg
+from backend.models import User, Profile, Item, WardrobeVersion
+from backend.catalog import get_catalog
+from backend.rules import score_catalog_breakdown, select_scored_rows, top_k_rows
 
 admin_bp = Blueprint("admin", __name__)
 
+USERS_PAGE = 100
+DEBUG_PAGE = 100  # ranked items per scoring-debugger page
+
 def admin_required(fn):
     """Decorator to require admin role"""
     @wraps(fn)
@@ -15,32 +26,61 @@ def admin_required(fn):
         claims = get_jwt()
         if claims.get('role') != 'admin':
             return jsonify({"error": "Admin access required"}), 403
+        # the token's role claim lives until expiry; confirm it against the (cached) user
+        info = user_cache.get_user_info(db_session(), get_jwt_identity())
+        if not info or info["role"] != 'admin':
+            return jsonify({"error": "Admin access required"}), 403
         return fn(*args, **kwargs)
     return wrapper
 
 @admin_bp.get("/users")
 @admin_required
 def list_users():
-    """List all users in the database"""
-    db = SessionLocal()
+    """
+    Users with their profile, ordered by id, with keyset pagination.
+    ?after_id=<last id of the previous page>&limit=100 (max 5000)
+    ?q=<email prefix> narrows the list (uses ix_users_email_prefix on Postgres).
+    Response: {"users": [...], "next_after_id": <id or null>}, streamed.
+    """
     try:
-        users = db.query(User).all()
-        return jsonify({
-            "users": [
-                {
-                    "id": u.id,
-                    "email": u.email,
-                    "role": u.role,
-                    "profile": {
-                        "location": u.profile.location_text if u.profile else None,
-                        "units": u.profile.units if u.profile else "F"
-                    }
-                }
-                for u in users
-            ]
-        }), 200
-    finally:
-        db.close()
+        after_id = int_arg("after_id", 0)
+        limit = int_arg("limit", USERS_PAGE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not 1 <= limit <= MAX_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_LIMIT}"}), 400
+    prefix = (request.args.get("q") or "").strip().lower()  # emails are stored lowercased
+
+    # one query: users with their profile joined in (was one extra query per user)
+    query = (
+        select(User.id, User.email, User.role, Profile.location_text, Profile.units)
+        .outerjoin(Profile, Profile.user_id == User.id)
+        .where(User.id > after_id)
+    )
+    if prefix:
+        query = query.where(User.email.startswith(prefix, autoescape=True))
+    query = query.order_by(User.id).limit(limit)
+
+    def generate():
+        result = db_session().execute(query.execution_options(yield_per=STREAM_CHUNK))
+        yield '{"users": ['
+        count, last_id = 0, None
+        for rows in result.partitions():
+            chunk = []
+            for user_id, email, role, location, units in rows:
+                chunk.append(json.dumps({
+                    "id": user_id,
+                    "email": email,
+                    "role": role,
+                    "profile": {"location": location, "units": units or "F"},
+                }))
+                last_id = user_id
+            yield ("," if count else "") + ",".join(chunk)
+            count += len(rows)
+        next_after_id = last_id if count == limit else None
+        yield f'], "next_after_id": {json.dumps(next_after_id)}}}'
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
 
 @admin_bp.patch("/users/<int:user_id>/role")
 @admin_required
@@ -52,53 +92,65 @@ def update_user_role(user_id):
     if new_role not in ["member", "admin"]:
         return jsonify({"error": "Invalid role. Must be 'member' or 'admin'"}), 400
     
-    db = SessionLocal()
-    try:
-        user = db.get(User, user_id)
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-        
-        user.role = new_role
-        db.commit()
-        
-        return jsonify({
-            "message": f"User {user.email} role updated to {new_role}",
-            "user": {
-                "id": user.id,
-                "email": user.email,
-                "role": user.role
-            }
-        }), 200
-    finally:
-        db.close()
+    db = db_session()
+    user = db.get(User, user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    user.role = new_role
+    db.commit()
+    user_cache.forget(user_id)
+    
+    return jsonify({
+        "message": f"User {user.email} role updated to {new_role}",
+        "user": {
+            "id": user.id,
+            "email": user.email,
+            "role": user.role
+        }
+    }), 200
 
 @admin_bp.delete("/users/<int:user_id>")
 @admin_required
 def delete_user(user_id):
     """Delete a user account"""
-    db = SessionLocal()
-    try:
-        user = db.get(User, user_id)
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-        
-        email = user.email
-        # Delete profile first (if it exists)
-        if user.profile:
-            db.delete(user.profile)
-        # Then delete user
-        db.delete(user)
-        db.commit()
-        
-        return jsonify({
-            "message": f"User {email} deleted successfully"
-        }), 200
-    finally:
-        db.close()
+    db = db_session()
+    user = db.get(User, user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    email = user.email
+    # Delete profile first (if it exists)
+    if user.profile:
+        db.delete(user.profile)
+    # and their wardrobe (bulk deletes: no per-item version bumps for a wardrobe that goes away)
+    db.query(Item).filter(Item.owner_id == user.id).delete(synchronize_session=False)
+    db.query(WardrobeVersion).filter(WardrobeVersion.user_id == user.id).delete(synchronize_session=False)
+    # Then delete user
+    db.delete(user)
+    db.commit()
+    user_cache.forget(user_id)
+    
+    return jsonify({
+        "message": f"User {email} deleted successfully"
+    }), 200
+
+@admin_bp.get("/metrics")
+@admin_required
+def get_metrics():
+    """Runtime metrics for this worker process (queues, pools, ...)"""
+    return jsonify(metrics.snapshot()), 200
 
 @admin_bp.post("/debug/test-outfit-scoring")
 @admin_required
 def debug_outfit_scoring():
+    """
+    Every item's score and its breakdown for a scenario, plus the outfit
+    recommend would pick, all from one scoring pass.
+    Body: {temp_f, occasion, condition, offset: 0, limit: 100}
+    all_items_scored is the best-first ranking from `offset`, at most
+    `limit` (max 5000) items; total_items is the whole catalog.
+    """
     data = request.get_json(force=True) or {}
     temp_f = data.get("temp_f")
     occasion = (data.get("occasion") or "casual_outing").strip()
@@ -109,61 +161,55 @@ def debug_outfit_scoring():
     
     try:
         temp_f = float(temp_f)
+        offset = int(data.get("offset") or 0)
+        limit = int(data["limit"]) if data.get("limit") is not None else DEBUG_PAGE
     except (TypeError, ValueError):
-        return jsonify({"error": "temp_f must be a number"}), 400
+        return jsonify({"error": "temp_f must be a number; offset and limit integers"}), 400
+    if offset < 0 or not 1 <= limit <= MAX_LIMIT:
+        return jsonify({"error": f"offset must be >= 0 and limit between 1 and {MAX_LIMIT}"}), 400
     
-    db = SessionLocal()
-    try:
-        items = db.query(Item).all()
-        
-        # Get the actual outfit that would be recommended to users
-        outfit_items = pick_outfit(
-            items,
-            temp_f=temp_f,
-            occasion=occasion,
-            condition=condition,
-            limit=4,
-        )
-        
-        # Score all items for the full table display
-        scored = []
-        for item in items:
-            score = score_item(item, temp_f, occasion, condition)
-            scored.append({
-                "id": item.id,
-                "name": item.name,
-                "category": item.category,
-                "score": score,
-                "warmth_score": item.warmth_score,
-                "formality": item.formality,
-                "activity_comfort": item.activity_comfort,
-            })
-        
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Convert outfit items to the same format
-        top_picks = [
-            {
-                "id": item.id,
-                "name": item.name,
-                "category": item.category,
-                "score": score_item(item, temp_f, occasion, condition),
-                "warmth_score": item.warmth_score,
-                "formality": item.formality,
-                "activity_comfort": item.activity_comfort,
+    db = db_session()
+    catalog = get_catalog(db)
+    items = catalog.items
+    result = score_catalog_breakdown(catalog, temp_f, occasion, condition)
+    
+    # The actual outfit that would be recommended to users, from the same scores
+    outfit_rows, _ = select_scored_rows(catalog, result.scores, temp_f, limit=4)
+    
+    # Only the requested page of the ranking gets sorted (best first, ties in catalog order)
+    ranked = top_k_rows(result.scores, np.arange(len(catalog)), offset + limit)[offset:]
+    
+    def scored(row):
+        item = items[row]
+        breakdown = None
+        if catalog.has_warmth[row]:
+            breakdown = {
+                "warmth_penalty": float(result.warmth_penalty[row]),
+                "formality_bonus": float(result.formality_bonus[row]),
+                "activity_bonus": float(result.activity_bonus[row]),
+                "condition_adjustment": float(result.condition_adjustment[row]),
             }
-            for item in outfit_items
-        ]
-        
-        return jsonify({
-            "test_params": {
-                "temp_f": temp_f,
-                "occasion": occasion,
-                "condition": condition,
-            },
-            "all_items_scored": scored,
-            "top_picks": top_picks, 
-        }), 200
-    finally:
-        db.close()
-
+        return {
+            "id": item.id,
+            "name": item.name,
+            "category": item.category,
+            "score": float(result.scores[row]),
+            "breakdown": breakdown,
+            "warmth_score": item.warmth_score,
+            "formality": item.formality,
+            "activity_comfort": item.activity_comfort,
+        }
+    
+    next_offset = offset + limit if offset + limit < len(catalog) else None
+    return jsonify({
+        "test_params": {
+            "temp_f": temp_f,
+            "occasion": occasion,
+            "condition": condition,
+        },
+        "total_items": len(catalog),
+        "offset": offset,
+        "next_offset": next_offset,
+        "all_items_scored": [scored(row) for row in ranked.tolist()],
+        "top_picks": [scored(row) for row in outfit_rows], 
+    }), 200
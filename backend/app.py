@@ -1,5 +1,5 @@
 import os
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 import requests
 from flask import Flask, jsonify, request
@@ -7,18 +7,20 @@ from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
 from flask_cors import CORS
 
-from backend.db import engine, Base, SessionLocal
-from backend.models import Item, User, Profile
+from backend.db import engine, Base, db_session
+from backend.models import User, Profile
+from backend.catalog import get_catalog
+from backend.planner import build_plan, condition_from_weather_code
+from backend.weather import request_from_api, get_current_temp, geocode, store_resolved_location
 from backend.auth import auth_bp
 from backend.admin import admin_bp
 from backend.recommendations import rec_bp
+from backend.items import items_bp
+from backend.wardrobe import wardrobe_bp
 
 load_dotenv()
 app = Flask(__name__)
-CORS(app)
-
-OPEN_METEO_BASE = "https://api.open-meteo.com/v1/forecast"
-OPEN_METEO_GEOCODE = "https://geocoding-api.open-meteo.com/v1/search"
+CORS(app, expose_headers=["X-Next-After-Id"])  # paging cursor of /api/items
 
 # JWT config
 app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "dev-secret-change-me")
@@ -38,75 +40,22 @@ def missing_token_callback(error):
 def invalid_token_callback(error):
     return jsonify({"error": "Invalid authorization token", "details": str(error)}), 401
 
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    # closes the request's session (rolling back anything uncommitted) and returns its connection
+    db_session.remove()
+
 # blueprints
 app.register_blueprint(auth_bp, url_prefix="/api/auth")
 app.register_blueprint(admin_bp, url_prefix="/api/admin")
 app.register_blueprint(rec_bp, url_prefix="/api")
+app.register_blueprint(items_bp, url_prefix="/api")
+app.register_blueprint(wardrobe_bp, url_prefix="/api")
 
 @app.route("/health")
 def health():
     return jsonify({"status": "Flask app working"})
 
-@app.get("/api/items")
-def list_items():
-    db = SessionLocal()
-    try:
-        rows = db.query(Item).limit(10).all()
-        return jsonify([{"id": r.id, "name": r.name, "formality": r.formality} for r in rows])
-    finally:
-        db.close()
-
-def request_from_api(lat, lon, hourly, units, timezone):
-    params = {"latitude": lat, "longitude": lon, "hourly": hourly, "timezone": timezone}
-    if units == "fahrenheit":
-        params["temperature_unit"] = "fahrenheit"
-    r = requests.get(OPEN_METEO_BASE, params=params, timeout=8)
-    r.raise_for_status()
-    return r.json()
-
-def get_current_temp(lat, lon, units, timezone):
-    """Get current temperature and daily high/low using the forecast endpoint"""
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "current": "temperature_2m",
-        "daily": "temperature_2m_max,temperature_2m_min",
-        "timezone": timezone
-    }
-    # Convert single letter to full unit name
-    if units == "f":
-        params["temperature_unit"] = "fahrenheit"
-    elif units == "c":
-        params["temperature_unit"] = "celsius"
-    try:
-        # Use the forecast endpoint with current and daily parameters
-        r = requests.get(OPEN_METEO_BASE, params=params, timeout=8)
-        r.raise_for_status()
-        data = r.json()
-        print(f"DEBUG: Current weather response: {data}")
-        current_data = data.get("current", {})
-        daily_data = data.get("daily", {})
-        temp = current_data.get("temperature_2m")
-        # Get the actual unit returned by the API
-        temp_unit = data.get("current_units", {}).get("temperature_2m", "°C")
-        # Get today's high and low (first element of daily arrays)
-        high = daily_data.get("temperature_2m_max", [None])[0]
-        low = daily_data.get("temperature_2m_min", [None])[0]
-        return temp, temp_unit, high, low
-    except Exception as e:
-        print(f"DEBUG: Error fetching current temp: {e}")
-        raise
-
-def geocode(city, country=None, state=None, count=5):
-    params = {"name": city, "count": count, "format": "json", "language": "en"}
-    if country: params["country"] = country
-    if state: params["admin1"] = state
-    r = requests.get(OPEN_METEO_GEOCODE, params=params, timeout=8)
-    r.raise_for_status()
-    data = r.json() or {}
-    results = data.get("results") or []
-    return results[0] if results else None
-
 @app.get("/weather/city/<path:city>")
 def get_weather(city):
     country = request.args.get("country")
@@ -137,28 +86,50 @@ def get_weather(city):
     except requests.exceptions.RequestException as e:
         return jsonify({"error": "Network error", "details": str(e)}), 502
 
-@app.get("/api/weather/saved")
-@jwt_required()
-def get_saved_weather():
-    """Fetch weather for the user's saved location"""
-    print("DEBUG: get_saved_weather called")
-    user_id = get_jwt_identity()
-    print(f"DEBUG: user_id={user_id}")
-    db = SessionLocal()
+MAX_PLAN_HOURS = 168
+
+@app.get("/api/plan/hourly")
+def get_hourly_plan():
+    """
+    Outfit plan for a time window, one outfit per run of hours that need the same outfit.
+    Location: ?city=... (plus optional country/state) or ?latitude=..&longitude=..
+    Window: ?hours=24 (max 168) starting now, or from ?start=YYYY-MM-DDTHH:MM (local time)
+    """
+    occasion = (request.args.get("occasion") or "casual_outing").strip()
+    timezone = request.args.get("timezone", "auto")
+    start = request.args.get("start")
     try:
-        profile = db.query(Profile).filter_by(user_id=int(user_id)).first()
-        if not profile or not profile.location_text or profile.location_text.strip() == "":
-            return jsonify({"error": "No saved location found", "code": "NO_LOCATION"}), 404
-        
-        location = profile.location_text.strip()
-        timezone = request.args.get("timezone", "auto")
-        units = profile.units.lower() if profile.units else "fahrenheit"
-        
+        hours = int(request.args.get("hours", "24"))
+    except ValueError:
+        return jsonify({"error": "hours must be an integer"}), 400
+    if not 1 <= hours <= MAX_PLAN_HOURS:
+        return jsonify({"error": f"hours must be between 1 and {MAX_PLAN_HOURS}"}), 400
+
+    window = {"forecast_hours": hours}
+    if start:
         try:
-            best = geocode(location)
+            start_dt = datetime.fromisoformat(start)
+        except ValueError:
+            return jsonify({"error": "start must be an ISO datetime like 2025-01-31T06:00"}), 400
+        end_dt = start_dt + timedelta(hours=hours - 1)
+        window = {"start_hour": start_dt.strftime("%Y-%m-%dT%H:%M"), "end_hour": end_dt.strftime("%Y-%m-%dT%H:%M")}
+
+    resolved = None
+    lat = lon = None
+    if request.args.get("latitude") and request.args.get("longitude"):
+        try:
+            lat, lon = float(request.args["latitude"]), float(request.args["longitude"])
+        except ValueError:
+            return jsonify({"error": "latitude/longitude must be numbers"}), 400
+    elif not request.args.get("city"):
+        return jsonify({"error": "city or latitude/longitude required"}), 400
+
+    try:
+        if lat is None:
+            city = request.args["city"]
+            best = geocode(city, country=request.args.get("country"), state=request.args.get("state"))
             if not best:
-                return jsonify({"error": "Could not geocode saved location", "location": location}), 404
-            
+                return jsonify({"error": "City not found", "query": {"city": city}}), 404
             lat, lon = best["latitude"], best["longitude"]
             resolved = {
                 "name": best.get("name"),
@@ -168,30 +139,98 @@ def get_saved_weather():
                 "admin1": best.get("admin1"),
                 "timezone": best.get("timezone"),
             }
-            # Get current temperature
-            current_temp, temp_unit, high, low = get_current_temp(lat, lon, units, timezone)
-            data = {
-                "current_temperature": current_temp,
-                "temperature_high": high,
-                "temperature_low": low,
-                "temperature_unit": temp_unit,
-                "user_units": profile.units,
-                "_resolved_location": resolved,
-                "timezone": best.get("timezone")
+
+        # one forecast call for the whole window
+        data = request_from_api(lat, lon, "temperature_2m,weather_code", "fahrenheit", timezone, **window)
+    except requests.exceptions.HTTPError as e:
+        status = getattr(e.response, "status_code", 502)
+        return jsonify({"error": "Upstream error", "details": str(e)}), status
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": "Network error", "details": str(e)}), 502
+
+    hourly = data.get("hourly", {})
+    times = hourly.get("time", [])
+    temps = hourly.get("temperature_2m", [])
+    conditions = [condition_from_weather_code(c) for c in hourly.get("weather_code", [None] * len(times))]
+
+    db = db_session()
+    segments = build_plan(get_catalog(db), times, temps, conditions, occasion)
+
+    def item_json(i):
+        return {"id": i.id, "name": i.name, "category": i.category}
+
+    return jsonify({
+        "occasion": occasion,
+        "timezone": data.get("timezone"),
+        "_resolved_location": resolved,
+        "segments": [
+            {
+                **seg,
+                "items": [item_json(i) for i in seg["items"]],
+                "changes": seg["changes"] and {
+                    "added": [item_json(i) for i in seg["changes"]["added"]],
+                    "removed": [item_json(i) for i in seg["changes"]["removed"]],
+                },
             }
-            return jsonify(data), 200
-        except requests.exceptions.HTTPError as e:
-            print(f"DEBUG: HTTP Error: {e}")
-            status = getattr(e.response, "status_code", 502)
-            return jsonify({"error": "Upstream error", "details": str(e)}), status
-        except requests.exceptions.RequestException as e:
-            print(f"DEBUG: Request Error: {e}")
-            return jsonify({"error": "Network error", "details": str(e)}), 502
-        except Exception as e:
-            print(f"DEBUG: Unexpected error: {e}")
-            return jsonify({"error": "Unexpected error", "details": str(e)}), 500
-    finally:
-        db.close()
+            for seg in segments
+        ],
+    }), 200
+
+@app.get("/api/weather/saved")
+@jwt_required()
+def get_saved_weather():
+    """Fetch weather for the user's saved location"""
+    print("DEBUG: get_saved_weather called")
+    user_id = get_jwt_identity()
+    print(f"DEBUG: user_id={user_id}")
+    db = db_session()
+    profile = db.query(Profile).filter_by(user_id=int(user_id)).first()
+    if not profile or not profile.location_text or profile.location_text.strip() == "":
+        return jsonify({"error": "No saved location found", "code": "NO_LOCATION"}), 404
+    
+    location = profile.location_text.strip()
+    timezone = request.args.get("timezone", "auto")
+    units = profile.units.lower() if profile.units else "fahrenheit"
+    user_units = profile.units
+    lat, lon = profile.latitude, profile.longitude
+    resolved, profile_timezone = profile.resolved_location, profile.timezone
+    # end the read transaction: don't hold a pooled connection while waiting on upstream
+    db.rollback()
+    
+    try:
+        if lat is None:
+            # coordinates are stored when the location is saved; older
+            # profiles (or a failed lookup back then) get resolved once here
+            best = geocode(location)
+            if not best:
+                return jsonify({"error": "Could not geocode saved location", "location": location}), 404
+            store_resolved_location(profile, best)
+            lat, lon = profile.latitude, profile.longitude
+            resolved, profile_timezone = profile.resolved_location, profile.timezone
+            db.commit()
+
+        # Get current temperature
+        current_temp, temp_unit, high, low = get_current_temp(lat, lon, units, timezone)
+        data = {
+            "current_temperature": current_temp,
+            "temperature_high": high,
+            "temperature_low": low,
+            "temperature_unit": temp_unit,
+            "user_units": user_units,
+            "_resolved_location": resolved,
+            "timezone": profile_timezone
+        }
+        return jsonify(data), 200
+    except requests.exceptions.HTTPError as e:
+        print(f"DEBUG: HTTP Error: {e}")
+        status = getattr(e.response, "status_code", 502)
+        return jsonify({"error": "Upstream error", "details": str(e)}), status
+    except requests.exceptions.RequestException as e:
+        print(f"DEBUG: Request Error: {e}")
+        return jsonify({"error": "Network error", "details": str(e)}), 502
+    except Exception as e:
+        print(f"DEBUG: Unexpected error: {e}")
+        return jsonify({"error": "Unexpected error", "details": str(e)}), 500
 
 # one-time table creation for local dev
 with engine.begin() as conn:
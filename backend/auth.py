@@ -1,17 +1,19 @@
 from flask import Blueprint, request, jsonify
-from passlib.hash import bcrypt
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from backend.db import SessionLocal
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from backend.db import db_session
 from backend.models import User, Profile
+from backend import passwords, user_cache
+from backend.weather import apply_resolved_location, geocode_location
 
 auth_bp = Blueprint("auth", __name__)
 
-def _db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _busy():
+    """Fast answer while the password pool is full, so logins don't pile up on workers."""
+    resp = jsonify({"error": "too many sign-in attempts right now, try again shortly"})
+    resp.headers["Retry-After"] = "1"
+    return resp, 429
 
 @auth_bp.post("/register")
 def register():
@@ -24,27 +26,40 @@ def register():
     if not email or not password:
         return jsonify({"error": "email and password required"}), 400
 
-    db = next(_db())
+    db = db_session()
     if db.query(User).filter_by(email=email).first():
         return jsonify({"error": "email already registered"}), 409
+    db.rollback()  # don't hold a pooled connection while hashing
+
+    try:
+        password_hash = passwords.hash_password(password)
+    except passwords.Saturated:
+        return _busy()
+    best = geocode_location(location)  # no transaction open while this waits on upstream
 
     user = User(
         email=email,
-        password_hash=bcrypt.hash(password),
+        password_hash=password_hash,
         role="member",
     )
     db.add(user)
-    db.flush()  # get user.id
-
-    profile = Profile(user_id=user.id, location_text=location, units=units)
-    db.add(profile)
-    db.commit()
+    try:
+        db.flush()  # get user.id
+        profile = Profile(user_id=user.id, location_text=location, units=units)
+        apply_resolved_location(profile, best)
+        db.add(profile)
+        user_id, role = user.id, user.role
+        db.commit()
+    except IntegrityError:
+        # registered by a concurrent request since the check above
+        db.rollback()
+        return jsonify({"error": "email already registered"}), 409
 
     token = create_access_token(
-    identity=str(user.id),  
-    additional_claims={"email": user.email, "role": user.role}
+    identity=str(user_id),  
+    additional_claims={"email": email, "role": role}
 )
-    return jsonify({"access_token": token, "user": {"id": user.id, "email": user.email}}), 201
+    return jsonify({"access_token": token, "user": {"id": user_id, "email": email}}), 201
 
 @auth_bp.post("/login")
 def login():
@@ -55,41 +70,43 @@ def login():
     if not email or not password:
         return jsonify({"error": "email and password required"}), 400
 
-    db = SessionLocal()
+    db = db_session()
+    user = db.query(User).filter_by(email=email).first()
+    if not user:
+        return jsonify({"error": "invalid credentials"}), 401
+    # read what the token needs now: rollback expires the instance, and touching
+    # it afterwards would query again
+    user_id, role, password_hash = user.id, user.role, user.password_hash
+    db.rollback()  # don't hold a pooled connection during the slow check
     try:
-        user = db.query(User).filter_by(email=email).first()
-        if not user or not bcrypt.verify(password, user.password_hash):
+        if not passwords.verify_password(password, password_hash):
             return jsonify({"error": "invalid credentials"}), 401
+    except passwords.Saturated:
+        return _busy()
+
+    # hashed at an older cost factor: upgrade it now that we have the password
+    if passwords.needs_rehash(password_hash):
+        try:
+            user.password_hash = passwords.hash_password(password)
+            db.commit()
+        except passwords.Saturated:
+            pass  # try again on a later login
 
-        token = create_access_token(
-            identity=str(user.id),  # <-- must be a string
-            additional_claims={"email": user.email, "role": user.role}
-        )
-        return jsonify({"access_token": token, "user": {"id": user.id, "email": user.email}})
-    finally:
-        db.close()
+    token = create_access_token(
+        identity=str(user_id),  # <-- must be a string
+        additional_claims={"email": email, "role": role}
+    )
+    return jsonify({"access_token": token, "user": {"id": user_id, "email": email}})
 
 @auth_bp.get("/me")
 @jwt_required()
 def me():
     user_id = get_jwt_identity()     # string (we set identity=str(user.id))
-    db = SessionLocal()
-    try:
-        user = db.get(User, int(user_id))   # SQLAlchemy 2.x style
-        if not user:
-            return jsonify({"error": "user not found"}), 404
-        profile = db.query(Profile).filter_by(user_id=user.id).first()
-        return jsonify({
-            "user": {
-                "id": user.id,
-                "email": user.email,
-                "role": user.role,
-                "location": profile.location_text if profile else None,
-                "units": profile.units if profile else "F"
-            }
-        })
-    finally:
-        db.close()
+    # called on every page load: served from the per-process cache (one joined query on a miss)
+    info = user_cache.get_user_info(db_session(), user_id)
+    if not info:
+        return jsonify({"error": "user not found"}), 404
+    return jsonify({"user": info})
 
 @auth_bp.patch("/me")
 @jwt_required()
@@ -98,28 +115,30 @@ def update_profile():
     data = request.get_json(force=True) or {}
     location = data.get("location")
     units = data.get("units")
+    new_location = None
+    if location is not None:
+        new_location = location.strip() if isinstance(location, str) else ""
+        # geocode before touching the DB so no transaction waits on upstream
+        best = geocode_location(new_location)
+
+    db = db_session()
+    profile = (
+        db.query(Profile)
+        .options(joinedload(Profile.user))
+        .filter_by(user_id=int(user_id))
+        .first()
+    )
+    if not profile:
+        return jsonify({"error": "profile not found"}), 404
     
-    db = SessionLocal()
-    try:
-        profile = db.query(Profile).filter_by(user_id=int(user_id)).first()
-        if not profile:
-            return jsonify({"error": "profile not found"}), 404
-        
-        if location is not None:
-            profile.location_text = location.strip() if isinstance(location, str) else ""
-        if units is not None:
-            profile.units = units.strip().upper() if isinstance(units, str) else "F"
-        
-        db.commit()
-        user = db.get(User, int(user_id))
-        return jsonify({
-            "user": {
-                "id": user.id,
-                "email": user.email,
-                "role": user.role,
-                "location": profile.location_text,
-                "units": profile.units
-            }
-        }), 200
-    finally:
-        db.close()
\ No newline at end of file
+    if new_location is not None:
+        if new_location != profile.location_text or profile.latitude is None:
+            profile.location_text = new_location
+            apply_resolved_location(profile, best)
+    if units is not None:
+        profile.units = units.strip().upper() if isinstance(units, str) else "F"
+    
+    info = user_cache.user_info(profile.user)  # before commit expires the loaded rows
+    db.commit()
+    user_cache.remember(info)
+    return jsonify({"user": info}), 200
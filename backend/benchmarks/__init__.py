@@ -0,0 +1,11 @@
+"""Offline benchmarks for the rules engine and the recommendation API.
+
+    python -m backend.benchmarks                       # micro + e2e, 1k/100k/1M items
+    python -m backend.benchmarks --sizes 1000,100000 --out results.json
+    python -m backend.benchmarks compare old.json new.json
+
+Everything runs in-process: the DB is a throwaway SQLite file and the
+upstream weather API is stubbed, so no network or Postgres is needed.
+Results are JSON (one record per benchmark and catalog size) so runs
+from two commits can be compared.
+"""
@@ -0,0 +1,126 @@
+"""python -m backend.benchmarks [--sizes ...] [--only micro|e2e] [--out file] | compare OLD NEW"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+DEFAULT_SIZES = "1000,100000,1000000"
+
+
+def _setup_env(workdir: str) -> None:
+    """Must run before any backend import: the DB engine and settings are read at import time."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.pop("CATALOG_FILE", None)
+    # anything not stubbed fails fast instead of reaching the network
+    os.environ["OPEN_METEO_BASE"] = "http://127.0.0.1:9/v1/forecast"
+    os.environ["OPEN_METEO_GEOCODE"] = "http://127.0.0.1:9/v1/search"
+    os.environ["WEATHER_RETRIES"] = "0"
+    os.environ.setdefault("PASSWORD_WORKERS", "0")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-not-for-production")
+
+
+def _meta(sizes) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import numpy as np
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "sizes": sizes,
+    }
+
+
+def run(args) -> int:
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    with tempfile.TemporaryDirectory(prefix="fitforecast-bench-") as workdir:
+        _setup_env(workdir)
+        from backend.benchmarks import e2e, micro
+
+        output = {"meta": _meta(sizes), "results": []}
+        for size in sizes:
+            for group, module in (("micro", micro), ("e2e", e2e)):
+                if args.only and args.only != group:
+                    continue
+                print(f"⏱️  {group} @ {size:,} items ...", file=sys.stderr)
+                # the app prints DEBUG lines; keep them out of the report
+                with redirect_stdout(sys.stderr if args.verbose else open(os.devnull, "w")):
+                    results = module.run(size, min_time=args.min_time)
+                for r in results:
+                    extra = f"  {r['items_per_sec']:,} items/s" if r.get("items_per_sec") else ""
+                    print(f"   {r['name']:<28} p50 {r['p50_ms']:>10.3f} ms  p95 {r['p95_ms']:>10.3f} ms{extra}")
+                output["results"].extend(results)
+
+        # write queued history rows and close connections while the scratch DB still exists
+        from backend.db import engine
+        from backend.history import writer
+
+        writer.close()
+        engine.dispose()
+
+    with open(args.out, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"✅ Wrote {len(output['results'])} results to {args.out}")
+    return 0
+
+
+def compare(args) -> int:
+    """p50 of every benchmark in NEW relative to OLD; nonzero exit if any got slower than --fail-above."""
+    with open(args.old) as f:
+        old = {(r["group"], r["name"], r["size"]): r for r in json.load(f)["results"]}
+    with open(args.new) as f:
+        new = json.load(f)["results"]
+
+    worst = 0.0
+    for r in new:
+        key = (r["group"], r["name"], r["size"])
+        before = old.get(key)
+        if before is None or not before["p50_ms"]:
+            print(f"   {r['group']:<6} {r['name']:<28} {r['size']:>9,}  (new)")
+            continue
+        ratio = r["p50_ms"] / before["p50_ms"]
+        worst = max(worst, ratio)
+        print(f"   {r['group']:<6} {r['name']:<28} {r['size']:>9,}  {before['p50_ms']:>10.3f} -> {r['p50_ms']:>10.3f} ms  x{ratio:.2f}")
+    if args.fail_above and worst > args.fail_above:
+        print(f"❌ slowest change x{worst:.2f} is above x{args.fail_above}")
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks")
+    sub = parser.add_subparsers(dest="command")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"catalog sizes (default {DEFAULT_SIZES})")
+    parser.add_argument("--only", choices=("micro", "e2e"))
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to keep sampling each benchmark")
+    parser.add_argument("--out", default="benchmark-results.json")
+    parser.add_argument("--verbose", action="store_true", help="show the app's own output")
+    cmp = sub.add_parser("compare", help="compare two result files")
+    cmp.add_argument("old")
+    cmp.add_argument("new")
+    cmp.add_argument("--fail-above", type=float, help="exit 1 if any p50 grew by more than this factor")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return compare(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
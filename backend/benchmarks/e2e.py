@@ -0,0 +1,116 @@
+"""End-to-end latency through the Flask app (test client, SQLite, stubbed weather).
+
+backend.benchmarks.__main__ points DATABASE_URL at a scratch SQLite file
+before this module is imported.
+"""
+
+import time
+from typing import Dict, List
+
+from sqlalchemy import delete, insert
+
+from backend import weather
+from backend.app import app
+from backend.benchmarks.micro import SCENARIOS
+from backend.benchmarks.synthetic import synthetic_rows
+from backend.benchmarks.timing import measure, record
+from backend.catalog import bump_catalog_version, invalidate_catalog
+from backend.db import SessionLocal
+from backend.models import Item, Profile, User
+
+INSERT_CHUNK = 10_000
+EMAIL = "bench@example.com"
+
+# what Open-Meteo returns for weather.current_temp_params (Fahrenheit)
+FORECAST = {
+    "current": {"temperature_2m": 48.2, "weather_code": 61},
+    "current_units": {"temperature_2m": "°F"},
+    "daily": {"temperature_2m_max": [55.0], "temperature_2m_min": [41.0]},
+}
+
+
+def _stub_forecast(lat, lon, params):
+    return FORECAST
+
+
+def _stub_geocode(city, country=None, state=None, count=5):
+    return {"name": city, "latitude": 42.36, "longitude": -71.06, "country": "US", "timezone": "America/New_York"}
+
+
+def stub_weather() -> None:
+    """Answer upstream weather calls in-process (the dashboard's only network use)."""
+    weather.fetch_forecast = _stub_forecast
+    weather.geocode = _stub_geocode
+
+
+def load_catalog(size: int) -> None:
+    """Replace the global catalog with `size` synthetic items (Core inserts)."""
+    db = SessionLocal()
+    try:
+        db.execute(delete(Item).where(Item.owner_id.is_(None)))
+        rows = []
+        for name, category, formality, warmth, activity in synthetic_rows(size):
+            rows.append({"name": name, "category": category, "formality": formality,
+                         "warmth_score": warmth, "activity_comfort": activity})
+            if len(rows) == INSERT_CHUNK:
+                db.execute(insert(Item), rows)
+                rows = []
+        if rows:
+            db.execute(insert(Item), rows)
+        bump_catalog_version(db)  # Core inserts skip the ORM listener
+        db.commit()
+    finally:
+        db.close()
+    invalidate_catalog()
+
+
+def bench_user(client) -> Dict[str, str]:
+    """Auth header for a member with a saved location (registered once)."""
+    r = client.post("/api/auth/login", json={"email": EMAIL, "password": "bench"})
+    if r.status_code != 200:
+        client.post("/api/auth/register", json={"email": EMAIL, "password": "bench"})
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter_by(email=EMAIL).one()
+            profile = db.query(Profile).filter_by(user_id=user.id).one()
+            profile.location_text = "Boston"
+            weather.store_resolved_location(profile, _stub_geocode("Boston"))
+            db.commit()
+        finally:
+            db.close()
+        r = client.post("/api/auth/login", json={"email": EMAIL, "password": "bench"})
+    return {"Authorization": f"Bearer {r.json['access_token']}"}
+
+
+def _scenario(i: int) -> Dict:
+    temp_f, occasion, condition = SCENARIOS[i % len(SCENARIOS)]
+    return {"temp_f": temp_f, "occasion": occasion, "condition": condition}
+
+
+def run(size: int, min_time: float = 0.5) -> List[Dict]:
+    stub_weather()
+    load_catalog(size)
+    client = app.test_client()
+    headers = bench_user(client)
+    results = []
+
+    def call(method, url, expect=200, **kw):
+        r = client.open(url, method=method, **kw)
+        if r.status_code != expect:
+            raise RuntimeError(f"{method} {url} -> {r.status_code}: {r.get_data(as_text=True)[:200]}")
+        return r
+
+    # first request after a catalog change: loads the catalog and builds its outfit table
+    t0 = time.perf_counter()
+    call("POST", "/api/recommendations", json=_scenario(0))
+    results.append(record("e2e", "recommendations_cold", size, [time.perf_counter() - t0]))
+
+    def bench(name, fn):
+        results.append(record("e2e", name, size, measure(fn, min_time=min_time)))
+
+    bench("recommendations_anonymous", lambda i: call("POST", "/api/recommendations", json=_scenario(i)))
+    bench("recommendations_member", lambda i: call("POST", "/api/recommendations", json=_scenario(i), headers=headers))
+    batch = {"requests": [_scenario(i) for i in range(28)]}  # a week x 4 occasions
+    bench("recommendations_batch_28", lambda i: call("POST", "/api/recommendations/batch", json=batch, headers=headers))
+    bench("dashboard", lambda i: call("GET", "/api/dashboard?alternatives=2", headers=headers))
+    return results
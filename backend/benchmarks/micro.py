@@ -0,0 +1,49 @@
+"""Microbenchmarks: scoring, selection and the per-snapshot structures."""
+
+from typing import Dict, List
+
+from backend.benchmarks.synthetic import synthetic_items
+from backend.benchmarks.timing import measure, record
+from backend.catalog import ItemCatalog
+from backend.catalog_index import CatalogIndex, select_outfit_rows_indexed
+from backend.outfit_table import OutfitTable, get_outfit_table, recommend
+from backend.rules import score_catalog, score_item, select_outfit_rows
+
+# rotated through so no single input gets lucky
+SCENARIOS = [
+    (t, occasion, condition)
+    for t in (28.0, 52.0, 68.0, 80.0, 92.0)
+    for occasion in ("casual_outing", "work_office", "formal_event", "workout")
+    for condition in (None, "rainy", "snowy", "sunny")
+]
+
+SCALAR_SAMPLE = 20_000  # score_item runs in pure Python: time it on at most this many items
+
+
+def run(size: int, min_time: float = 0.5) -> List[Dict]:
+    items = synthetic_items(size)
+    results = []
+
+    def bench(name, fn, per_call=None, **kw):
+        results.append(record("micro", name, size, measure(fn, min_time=min_time, **kw), per_call))
+
+    bench("catalog_build", lambda i: ItemCatalog(items), max_runs=5, warmup=0)
+    catalog = ItemCatalog(items)
+
+    sample = items[:SCALAR_SAMPLE]
+
+    def scalar(i):
+        temp_f, occasion, condition = SCENARIOS[i % len(SCENARIOS)]
+        for item in sample:
+            score_item(item, temp_f, occasion, condition)
+
+    bench("score_item", scalar, per_call=len(sample), max_runs=20)
+    bench("score_catalog", lambda i: score_catalog(catalog, *SCENARIOS[i % len(SCENARIOS)]), per_call=size)
+    bench("select_outfit_rows", lambda i: select_outfit_rows(catalog, *SCENARIOS[i % len(SCENARIOS)]), per_call=size)
+
+    bench("index_build", lambda i: CatalogIndex(catalog), max_runs=5, warmup=0)
+    get_outfit_table(catalog)  # builds the memoized index as well
+    bench("select_outfit_rows_indexed", lambda i: select_outfit_rows_indexed(catalog, *SCENARIOS[i % len(SCENARIOS)]))
+    bench("outfit_table_build", lambda i: OutfitTable(catalog), max_runs=5, warmup=0)
+    bench("recommend", lambda i: recommend(catalog, *SCENARIOS[i % len(SCENARIOS)], alternatives=3))
+    return results
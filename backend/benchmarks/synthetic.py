@@ -0,0 +1,31 @@
+"""Synthetic catalogs shaped like the seed data, at any size."""
+
+from typing import Iterator, List
+
+from backend.catalog import ItemRecord
+from backend.seed_items import BOTTOMS, OUTERWEAR, SHOES, TOPS
+
+CATEGORIES = (("top", TOPS), ("bottom", BOTTOMS), ("outerwear", OUTERWEAR), ("shoes", SHOES))
+
+
+def synthetic_rows(n: int) -> Iterator[tuple]:
+    """
+    n (name, category, formality, warmth_score, activity_comfort) rows:
+    seed_items' base items in equal shares per category, repeated as
+    "Name (vN)" variants like expand_to_25. Variants shift warmth by -1/0/+1
+    (kept in 1-10) so large catalogs aren't one big tie. Deterministic.
+    """
+    for i in range(n):
+        category, base = CATEGORIES[i % len(CATEGORIES)]
+        k = i // len(CATEGORIES)
+        name, formality, warmth, activity = base[k % len(base)]
+        variant = k // len(base)
+        if variant:
+            name = f"{name} (v{variant})"
+            warmth = min(max(warmth + variant % 3 - 1, 1), 10)
+        yield name, category, formality, warmth, activity
+
+
+def synthetic_items(n: int) -> List[ItemRecord]:
+    """synthetic_rows as ItemRecords with ids 1..n (what get_catalog would load)."""
+    return [ItemRecord(i, *row) for i, row in enumerate(synthetic_rows(n), start=1)]
@@ -0,0 +1,50 @@
+"""Timing helpers and the result record every benchmark emits."""
+
+import math
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def measure(fn: Callable[[int], object], min_time: float = 0.5, max_runs: int = 1000, warmup: int = 1) -> List[float]:
+    """
+    Seconds per call of fn(i), i = 0, 1, 2, ... (so callers can rotate
+    inputs). Runs at least 3 times, then until min_time has passed or
+    max_runs is reached. The first `warmup` calls are not counted.
+    """
+    for i in range(warmup):
+        fn(i)
+    samples: List[float] = []
+    started = time.perf_counter()
+    i = warmup
+    while len(samples) < 3 or (time.perf_counter() - started < min_time and len(samples) < max_runs):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t0)
+        i += 1
+    return samples
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def record(group: str, name: str, size: int, samples: List[float], per_call: Optional[int] = None) -> Dict:
+    """
+    One result: latency stats in milliseconds; with per_call (items
+    scored per call), also items_per_sec from the median.
+    """
+    ordered = sorted(samples)
+    p50 = _percentile(ordered, 0.50)
+    result = {
+        "group": group,
+        "name": name,
+        "size": size,
+        "runs": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4),
+        "p50_ms": round(p50 * 1000, 4),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+    }
+    if per_call:
+        result["items_per_sec"] = round(per_call / p50) if p50 > 0 else None
+    return result
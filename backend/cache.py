@@ -0,0 +1,165 @@
+"""Small TTL + LRU caches with pluggable storage.
+
+MemoryCache lives in one process. SQLiteCache keeps entries in a local
+SQLite file, so every worker on a host shares them. Both have the same
+interface and store JSON-serializable values. Expired entries are kept
+(until evicted) so callers can fall back to stale data when upstream is
+down: get(key, allow_stale=True).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Tuple
+
+MISS = object()
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU with a TTL per entry."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, allow_stale: bool = False) -> Any:
+        """The cached value, or MISS."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at < time.time() and not allow_stale:
+                return MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache:
+    """
+    LRU with TTL stored in a SQLite file (shared by processes on one host).
+    Each process opens its own connection on first use: a SQLite handle
+    must not be used on both sides of a fork.
+    """
+
+    def __init__(self, path: str, maxsize: int = 1024, table: str = "cache"):
+        self.path = path
+        self.maxsize = maxsize
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._inherited = []  # parent's handles: never used, and never closed from this side either
+
+    def _connect(self) -> sqlite3.Connection:
+        # call with self._lock held
+        if self._pid != os.getpid():
+            if self._conn is not None:
+                self._inherited.append(self._conn)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_used_at ON {self.table} (used_at)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str, allow_stale: bool = False) -> Any:
+        """The cached value, or MISS."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] < now and not allow_stale):
+                return MISS
+            conn.execute(f"UPDATE {self.table} SET used_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connect().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute(f"DELETE FROM {self.table}")
+
+
+def cache_from_url(url: str, maxsize: int = 1024, table: str = "cache"):
+    """"memory" -> MemoryCache, "sqlite:///path/to/file.db" -> SQLiteCache."""
+    if not url or url == "memory":
+        return MemoryCache(maxsize)
+    if url.startswith("sqlite:///"):
+        return SQLiteCache(url[len("sqlite:///"):], maxsize, table)
+    raise ValueError(f"unsupported cache url: {url!r}")
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one: the first caller
+    runs fn(), everyone else arriving meanwhile waits and gets the same
+    result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event()}
+        if not leader:
+            call["done"].wait()
+            if "error" in call:
+                raise call["error"]
+            return call["result"]
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
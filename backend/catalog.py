@@ -0,0 +1,341 @@
+"""Column-oriented view of the item catalog used by the rules engine.
+
+Scoring ORM Items one at a time is fine for a hundred rows, but the
+catalog can grow far past that. ItemCatalog packs the fields the rules
+look at into NumPy arrays so the whole catalog can be scored in one
+vectorized pass (see rules.score_catalog).
+
+The catalog is also cached per process: get_catalog() returns an
+immutable snapshot that is only reloaded when the catalog_version row
+changes. Every flush that touches an Item bumps that row (see
+_bump_on_item_write), so writers don't need to do anything special.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import event, inspect, select, update, insert
+from sqlalchemy.orm import Session
+
+from backend.models import Item, CatalogVersion, WardrobeVersion
+
+# code used for missing / empty strings (never equal to a real code)
+MISSING = -1
+# code returned when looking up a value that isn't in the catalog at all
+UNKNOWN = -2
+
+
+class ItemRecord(NamedTuple):
+    """
+    Immutable, compact copy of an Item row: a plain tuple with named
+    fields, no ORM instance state, __dict__ or lazy loading. The cached
+    catalog holds these; the rules accept them anywhere they take an Item.
+    """
+    id: Optional[int]
+    name: Optional[str]
+    category: Optional[str]
+    formality: Optional[str]
+    warmth_score: Optional[int]
+    activity_comfort: Optional[str]
+
+
+ItemLike = Union[Item, ItemRecord]
+
+
+def to_record(item: ItemLike) -> ItemRecord:
+    """ItemRecord from an ORM Item (or anything with the same attributes)."""
+    if isinstance(item, ItemRecord):
+        return item
+    return ItemRecord(
+        item.id, item.name, item.category, item.formality, item.warmth_score, item.activity_comfort
+    )
+
+
+def to_records(items: Iterable[ItemLike]) -> List[ItemRecord]:
+    return [to_record(i) for i in items]
+
+
+def _encode(values: Sequence) -> Tuple[np.ndarray, Dict[str, int]]:
+    """Dictionary-encode strings into int32 codes. Falsy values -> MISSING."""
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter(
+        (vocab.setdefault(v, len(vocab)) if v else MISSING for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, vocab
+
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
+
+
+# array attributes of ItemCatalog, and the value -> code dicts (<name>_vocab)
+COLUMNS = ("ids", "warmth", "has_warmth", "category_codes", "slot_codes", "formality_codes", "activity_codes", "is_boot")
+VOCABS = ("category", "slot", "formality", "activity")
+
+
+class ItemCatalog:
+    """
+    Read-only columnar snapshot of a list of items.
+
+    Columns (one row per item, same order as `items`):
+      ids             int64, -1 if the item has no id yet
+      warmth          int64, 0 where warmth_score is None
+      has_warmth      bool
+      category_codes  int32 codes of the raw category (rules compare exactly)
+      slot_codes      int32 codes of the lowercased category (outfit slots)
+      formality_codes int32
+      activity_codes  int32
+      is_boot         bool, shoes with "boot" in the name
+    """
+
+    def __init__(self, items: Iterable[ItemLike], version: Optional[int] = None):
+        self.version = version
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.RLock()  # builders may use other derived structures
+        self.items: Sequence[ItemLike] = tuple(items)
+        n = len(self.items)
+
+        self.ids = _readonly(np.fromiter(
+            (i.id if i.id is not None else -1 for i in self.items), dtype=np.int64, count=n
+        ))
+        warmth = [i.warmth_score for i in self.items]
+        self.has_warmth = _readonly(np.fromiter((w is not None for w in warmth), dtype=bool, count=n))
+        self.warmth = _readonly(np.fromiter((w or 0 for w in warmth), dtype=np.int64, count=n))
+
+        categories = [i.category for i in self.items]
+        codes, self.category_vocab = _encode(categories)
+        self.category_codes = _readonly(codes)
+        codes, self.slot_vocab = _encode([(c or "").lower() for c in categories])
+        self.slot_codes = _readonly(codes)
+        codes, self.formality_vocab = _encode([i.formality for i in self.items])
+        self.formality_codes = _readonly(codes)
+        codes, self.activity_vocab = _encode([i.activity_comfort for i in self.items])
+        self.activity_codes = _readonly(codes)
+
+        self.is_boot = _readonly(np.fromiter(
+            (i.category == "shoes" and "boot" in (i.name or "").lower() for i in self.items),
+            dtype=bool,
+            count=n,
+        ))
+
+    @classmethod
+    def from_columns(
+        cls,
+        items: Sequence[ItemLike],
+        columns: Dict[str, np.ndarray],
+        vocabs: Dict[str, Dict[str, int]],
+        version: Optional[int] = None,
+    ) -> "ItemCatalog":
+        """
+        Wrap columns that were already encoded (e.g. views into a catalog
+        file, see backend.catalog_file) without touching the items.
+        """
+        self = cls.__new__(cls)
+        self.version = version
+        self._derived = {}
+        self._derived_lock = threading.RLock()
+        self.items = items
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        for name in VOCABS:
+            setattr(self, f"{name}_vocab", vocabs[name])
+        return self
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def derived(self, name: str, build: Callable[["ItemCatalog"], Any]) -> Any:
+        """
+        Memoize a structure computed from this snapshot (lookup tables,
+        indexes...). Since a new snapshot is built whenever the catalog
+        version changes, derived structures are rebuilt along with it.
+        """
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = build(self)
+            return self._derived[name]
+
+    # ---- code lookups (UNKNOWN never matches any row) ----
+    def category_code(self, value: str) -> int:
+        return self.category_vocab.get(value, UNKNOWN)
+
+    def slot_code(self, value: str) -> int:
+        return self.slot_vocab.get(value, UNKNOWN)
+
+    def formality_code(self, value: str) -> int:
+        return self.formality_vocab.get(value, UNKNOWN)
+
+    def activity_code(self, value: str) -> int:
+        return self.activity_vocab.get(value, UNKNOWN)
+
+
+# ---- versioned per-process snapshot ----
+
+# how often (seconds) to re-read catalog_version; 0 checks on every request
+CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "2"))
+# published catalog file (see backend.catalog_file); when it exists the
+# DB is not read for the catalog at all
+CATALOG_FILE = os.getenv("CATALOG_FILE")
+
+_lock = threading.Lock()
+_snapshot: Optional[ItemCatalog] = None
+_checked_at = 0.0
+
+
+def current_version(db: Session) -> int:
+    return db.execute(select(CatalogVersion.version).where(CatalogVersion.id == 1)).scalar() or 0
+
+
+def _bump(db: Session, model, key: dict) -> None:
+    """
+    version += 1 for the row with `key`, creating it at 1 if missing.
+    One upsert statement, so two first writers can't both try to insert it.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        db.execute(
+            upsert(model)
+            .values(**key, version=1)
+            .on_conflict_do_update(index_elements=list(key), set_={"version": model.version + 1})
+        )
+        return
+    # other databases: no portable upsert; fine for a single writer
+    res = db.execute(update(model).filter_by(**key).values(version=model.version + 1))
+    if res.rowcount == 0:
+        db.execute(insert(model).values(**key, version=1))
+
+
+def bump_catalog_version(db: Session) -> None:
+    """Mark the items table as changed. Runs inside the caller's transaction."""
+    _bump(db, CatalogVersion, {"id": 1})
+
+
+def wardrobe_version(db: Session, user_id: int) -> int:
+    return db.execute(select(WardrobeVersion.version).where(WardrobeVersion.user_id == user_id)).scalar() or 0
+
+
+def bump_wardrobe_version(db: Session, user_id: int) -> None:
+    """Mark a user's wardrobe as changed. Runs inside the caller's transaction."""
+    _bump(db, WardrobeVersion, {"user_id": user_id})
+
+
+def _owners(item: Item) -> set:
+    """Owners an item write affects (old and new, if it moved); None is the global catalog."""
+    return {item.owner_id, *inspect(item).attrs.owner_id.history.deleted}
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_on_item_write(session, flush_context, instances):
+    owners = set()
+    for o in (*session.new, *session.deleted):
+        if isinstance(o, Item):
+            owners |= _owners(o)
+    for o in session.dirty:
+        if isinstance(o, Item) and session.is_modified(o):
+            owners |= _owners(o)
+    if None in owners:
+        bump_catalog_version(session)
+    for user_id in owners - {None}:
+        bump_wardrobe_version(session, user_id)
+
+
+# everything the rules and the item JSON read, in ItemRecord field order
+ITEM_COLUMNS = (Item.id, Item.name, Item.category, Item.formality, Item.warmth_score, Item.activity_comfort)
+
+
+def load_items(db: Session) -> List[ItemRecord]:
+    """The global catalog (items without an owner) as ItemRecords; Core select, no ORM objects."""
+    make = ItemRecord._make
+    return [make(row) for row in db.execute(select(*ITEM_COLUMNS).where(Item.owner_id.is_(None)).order_by(Item.id))]
+
+
+def get_catalog(db: Session) -> ItemCatalog:
+    """
+    Return the cached catalog snapshot, reloading it only if the
+    catalog version changed. Within CHECK_INTERVAL of the last check
+    this does no DB reads at all.
+    With CATALOG_FILE set, the mapped file is used instead of the DB.
+    """
+    if CATALOG_FILE:
+        from backend.catalog_file import file_catalog  # imports this module
+
+        catalog = file_catalog(CATALOG_FILE)
+        if catalog is not None:
+            return catalog
+
+    global _snapshot, _checked_at
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+        return snapshot
+
+    version = current_version(db)
+    if snapshot is None or snapshot.version != version:
+        with _lock:
+            if _snapshot is None or _snapshot.version != version:
+                items = load_items(db)
+                _snapshot = ItemCatalog(items, version=version)
+            snapshot = _snapshot
+    _checked_at = time.monotonic()
+    return snapshot
+
+
+def invalidate_catalog() -> None:
+    """Drop the cached snapshots (e.g. after bulk writes that bypass the ORM)."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+    with _wardrobe_lock:
+        _wardrobes.clear()
+
+
+# ---- per-user wardrobe partitions ----
+
+# users whose wardrobe snapshot is kept per process (least recently used are dropped)
+WARDROBE_CACHE_SIZE = int(os.getenv("WARDROBE_CACHE_SIZE", "1024"))
+
+_wardrobe_lock = threading.Lock()
+_wardrobes: "OrderedDict[int, Tuple[float, ItemCatalog]]" = OrderedDict()  # user_id -> (checked_at, snapshot)
+
+
+def load_wardrobe_items(db: Session, user_id: int) -> List[ItemRecord]:
+    make = ItemRecord._make
+    query = select(*ITEM_COLUMNS).where(Item.owner_id == user_id).order_by(Item.id)
+    return [make(row) for row in db.execute(query)]
+
+
+def get_wardrobe(db: Session, user_id: int) -> ItemCatalog:
+    """
+    The user's own items as a small catalog snapshot, cached and
+    version-checked like get_catalog but per user. Loading it only reads
+    that user's rows (items.owner_id is indexed).
+    """
+    user_id = int(user_id)
+    with _wardrobe_lock:
+        entry = _wardrobes.get(user_id)
+        if entry is not None:
+            _wardrobes.move_to_end(user_id)
+    if entry is not None and time.monotonic() - entry[0] < CHECK_INTERVAL:
+        return entry[1]
+
+    version = wardrobe_version(db, user_id)
+    if entry is not None and entry[1].version == version:
+        wardrobe = entry[1]
+    else:
+        wardrobe = ItemCatalog(load_wardrobe_items(db, user_id) if version else [], version=version)
+    with _wardrobe_lock:
+        _wardrobes[user_id] = (time.monotonic(), wardrobe)
+        _wardrobes.move_to_end(user_id)
+        while len(_wardrobes) > WARDROBE_CACHE_SIZE:
+            _wardrobes.popitem(last=False)
+    return wardrobe
@@ -0,0 +1,193 @@
+"""Binary columnar catalog file, shared by worker processes via mmap.
+
+An exporter (scripts/export_catalog.py) writes the items table to one
+file. Every ItemCatalog column is stored as a fixed-width array; item
+names and the category/formality/activity strings go into a string
+table. Workers mmap the file read-only and wrap the arrays with
+np.frombuffer, so the scoring arrays are views into the page cache
+shared by every process on the host, not per-worker copies. Items are
+decoded into ItemRecords only when a row is actually returned.
+
+Layout:
+    MAGIC (8 bytes) | header length (uint64 LE) | header (JSON) | arrays
+Every array starts on a 64-byte boundary. The header gives the catalog
+version, item count, vocabularies, and dtype/offset/length for each
+array.
+
+Publishing is atomic: the exporter writes a temp file next to the
+target and os.replace()s it. A worker notices the new inode (checked at
+most every CATALOG_CHECK_INTERVAL seconds) and maps it. Requests still
+holding the previous snapshot keep reading the old mapping, which stays
+valid until they drop it.
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.catalog import CHECK_INTERVAL, COLUMNS, VOCABS, ItemCatalog, ItemRecord
+
+MAGIC = b"FFCAT001"
+ALIGN = 64
+_HEADER_LEN = struct.Struct("<Q")
+
+
+def _raw_codes(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, List[str]]:
+    """Codes into a string list; None -> -1 ("" is kept as a value, unlike catalog._encode)."""
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v is None else vocab.setdefault(v, len(vocab)) for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, list(vocab)
+
+
+def write_catalog_file(catalog: ItemCatalog, path: str) -> None:
+    """Write `catalog` to `path` atomically (readers see the old file or the new one)."""
+    items = catalog.items
+    arrays = {name: np.ascontiguousarray(getattr(catalog, name)) for name in COLUMNS}
+
+    # string table: names as one UTF-8 blob plus offsets, other strings as codes
+    names = [(i.name.encode("utf-8") if i.name is not None else b"") for i in items]
+    arrays["name_offsets"] = np.zeros(len(items) + 1, dtype=np.int64)
+    np.cumsum([len(n) for n in names], out=arrays["name_offsets"][1:])
+    arrays["names"] = np.frombuffer(b"".join(names), dtype=np.uint8)
+    arrays["has_name"] = np.fromiter((i.name is not None for i in items), dtype=bool, count=len(items))
+    strings = {}
+    for field in ("category", "formality", "activity_comfort"):
+        arrays[f"{field}_raw"], strings[field] = _raw_codes([getattr(i, field) for i in items])
+
+    header = {
+        "version": catalog.version,
+        "count": len(items),
+        "vocabs": {name: list(getattr(catalog, f"{name}_vocab")) for name in VOCABS},
+        "strings": strings,
+        "arrays": {},
+    }
+    # offsets are relative to the data section, so the header can be sized first
+    offset = 0
+    for name, arr in arrays.items():
+        header["arrays"][name] = [arr.dtype.str, offset, arr.nbytes]
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(len(MAGIC) + _HEADER_LEN.size + len(header_bytes)) // ALIGN) * ALIGN
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".catalog-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + _HEADER_LEN.pack(len(header_bytes)) + header_bytes)
+            for name, arr in arrays.items():
+                f.seek(data_start + header["arrays"][name][1])
+                f.write(arr.tobytes())
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class FileItems(Sequence):
+    """catalog.items for a mapped file: rows are decoded into ItemRecords on access."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], strings: Dict[str, List[str]]):
+        self._a = arrays
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._a["ids"])
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        a = self._a
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("catalog row out of range")
+
+        def string(field):
+            code = int(a[f"{field}_raw"][row])
+            return None if code < 0 else self._strings[field][code]
+
+        name = None
+        if a["has_name"][row]:
+            start, end = a["name_offsets"][row], a["name_offsets"][row + 1]
+            name = a["names"][start:end].tobytes().decode("utf-8")
+        item_id = int(a["ids"][row])
+        return ItemRecord(
+            None if item_id == -1 else item_id,
+            name,
+            string("category"),
+            string("formality"),
+            int(a["warmth"][row]) if a["has_warmth"][row] else None,
+            string("activity_comfort"),
+        )
+
+
+def open_catalog_file(path: str) -> ItemCatalog:
+    """Map a catalog file read-only and wrap it as an ItemCatalog (no copies)."""
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buf[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a catalog file")
+    (header_len,) = _HEADER_LEN.unpack_from(buf, len(MAGIC))
+    header_start = len(MAGIC) + _HEADER_LEN.size
+    header = json.loads(buf[header_start:header_start + header_len].decode("utf-8"))
+    data_start = -(-(header_start + header_len) // ALIGN) * ALIGN
+
+    arrays = {}
+    for name, (dtype, offset, nbytes) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        arrays[name] = np.frombuffer(buf, dtype=dtype, count=nbytes // dtype.itemsize, offset=data_start + offset)
+
+    vocabs = {name: {v: code for code, v in enumerate(values)} for name, values in header["vocabs"].items()}
+    items = FileItems(arrays, header["strings"])
+    return ItemCatalog.from_columns(items, {name: arrays[name] for name in COLUMNS}, vocabs, header["version"])
+
+
+# ---- per-process view of the published file ----
+
+_lock = threading.Lock()
+_mapped: Dict[str, Tuple[tuple, ItemCatalog]] = {}  # path -> (stat key, catalog)
+_checked_at: Dict[str, float] = {}
+
+
+def file_catalog(path: str) -> Optional[ItemCatalog]:
+    """
+    The catalog published at `path`, remapped when the exporter replaces
+    the file. None if there is no file (callers fall back to the DB).
+    """
+    mapped = _mapped.get(path)
+    if mapped is not None and time.monotonic() - _checked_at.get(path, 0.0) < CHECK_INTERVAL:
+        return mapped[1]
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if mapped is None or mapped[0] != key:
+        with _lock:
+            mapped = _mapped.get(path)
+            if mapped is None or mapped[0] != key:
+                mapped = _mapped[path] = (key, open_catalog_file(path))
+    _checked_at[path] = time.monotonic()
+    return mapped[1]
+
+
+def forget_file_catalogs() -> None:
+    with _lock:
+        _mapped.clear()
+        _checked_at.clear()
@@ -0,0 +1,179 @@
+"""Bucketed index over a catalog snapshot for branch-and-bound selection.
+
+Items are grouped as slot (lowercased category) -> formality -> activity
+-> warmth score. Every item in a leaf bucket scores exactly the same
+(the leaf also splits on the two name/category flags the rainy rule
+looks at), so a bucket is scored once with rules.score_item on any of
+its items. Whole formality/activity buckets are skipped when their
+upper bound can't reach the current k-th best score, so selecting an
+outfit costs O(buckets) instead of O(items).
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from backend.catalog import ItemCatalog
+from backend.rules import (
+    assemble_outfit,
+    match_bonuses,
+    score_item,
+    temp_to_warmth_band,
+)
+
+# Largest possible condition adjustment in score_item
+# (rainy: outerwear +1.5 and boots +2.0; snowy: warm items +2.5)
+_CONDITION_MAX_BONUS = {"rainy": 3.5, "snowy": 2.5}
+
+# slack for float rounding when comparing bounds to real scores
+_EPS = 1e-9
+
+
+class Leaf(NamedTuple):
+    warmth: int
+    rows: np.ndarray  # ascending row indices into catalog.items
+
+
+class Bucket(NamedTuple):
+    formality: Optional[str]
+    activity: Optional[str]
+    min_warmth: int
+    max_warmth: int
+    leaves: List[Leaf]
+
+
+class CatalogIndex:
+    """
+    buckets[slot][formality][activity][warmth] -> leaves for one snapshot.
+    Items without a warmth_score (which always score -999) are left out.
+    """
+
+    def __init__(self, catalog: ItemCatalog):
+        self.catalog = catalog
+        self.buckets: Dict[str, Dict[Optional[str], Dict[Optional[str], Dict[int, List[Leaf]]]]] = {}
+
+        rows = np.flatnonzero(catalog.has_warmth)
+        if len(rows) == 0:
+            self._by_slot: Dict[str, List[Bucket]] = {}
+            return
+
+        outerwear_code = catalog.category_code("outerwear")
+        keys = np.stack([
+            catalog.slot_codes[rows],
+            catalog.formality_codes[rows],
+            catalog.activity_codes[rows],
+            catalog.warmth[rows],
+            catalog.category_codes[rows] == outerwear_code,
+            catalog.is_boot[rows],
+        ], axis=1).astype(np.int64)
+        uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind="stable")
+        groups = np.split(rows[order], np.cumsum(np.bincount(inverse))[:-1])
+
+        slots = {code: name for name, code in catalog.slot_vocab.items()}
+        formalities = {code: name for name, code in catalog.formality_vocab.items()}
+        activities = {code: name for name, code in catalog.activity_vocab.items()}
+
+        for (slot, formality, activity, warmth, _, _), leaf_rows in zip(uniq.tolist(), groups):
+            by_formality = self.buckets.setdefault(slots.get(slot, ""), {})
+            by_activity = by_formality.setdefault(formalities.get(formality), {})
+            by_warmth = by_activity.setdefault(activities.get(activity), {})
+            by_warmth.setdefault(warmth, []).append(Leaf(warmth, leaf_rows))
+
+        # flatten the two upper levels into buckets we can bound and prune
+        self._by_slot = {}
+        for slot, by_formality in self.buckets.items():
+            flat = self._by_slot.setdefault(slot, [])
+            for formality, by_activity in by_formality.items():
+                for activity, by_warmth in by_activity.items():
+                    leaves = [leaf for w in sorted(by_warmth) for leaf in by_warmth[w]]
+                    flat.append(Bucket(formality, activity, min(by_warmth), max(by_warmth), leaves))
+
+    def top_rows(
+        self,
+        slot: Optional[str],
+        k: int,
+        temp_f: float,
+        occasion: str,
+        condition: Optional[str] = None,
+    ) -> List[int]:
+        """
+        The k best rows with score > 0 in `slot` (all slots if None), best
+        first with ties in catalog order -- same as a stable sort over
+        rules.score_catalog, but only buckets that can still make the
+        top k get scored.
+        """
+        if k <= 0:
+            return []
+        if slot is None:
+            buckets = [b for bs in self._by_slot.values() for b in bs]
+        else:
+            buckets = self._by_slot.get(slot, [])
+
+        target = temp_to_warmth_band(temp_f)
+        cond_max = _CONDITION_MAX_BONUS.get((condition or "").lower(), 0.0)
+
+        def bound(bucket: Bucket) -> float:
+            distance = max(0, bucket.min_warmth - target, target - bucket.max_warmth)
+            formality_bonus, activity_bonus = match_bonuses(bucket.formality, bucket.activity, occasion)
+            return 10.0 - distance * 1.2 + formality_bonus + activity_bonus + cond_max
+
+        found: List[Tuple[float, np.ndarray]] = []
+        kth_best = 0.0  # scores must be > 0 regardless
+
+        for upper, bucket in sorted(((bound(b), b) for b in buckets), key=lambda x: -x[0]):
+            if upper + _EPS < kth_best or upper <= 0:
+                break  # sorted by bound, nothing after this can make it either
+            for leaf in bucket.leaves:
+                score = score_item(self.catalog.items[int(leaf.rows[0])], temp_f, occasion, condition)
+                if score > 0 and score >= kth_best:
+                    found.append((score, leaf.rows))
+            kth_best = max(kth_best, _kth_score(found, k))
+
+        return _merge(found, k)
+
+
+def _kth_score(found: List[Tuple[float, np.ndarray]], k: int) -> float:
+    """Score of the k-th best row found so far (0 if fewer than k rows)."""
+    count = 0
+    for score, rows in sorted(found, key=lambda x: -x[0]):
+        count += len(rows)
+        if count >= k:
+            return score
+    return 0.0
+
+
+def _merge(found: List[Tuple[float, np.ndarray]], k: int) -> List[int]:
+    """Flatten (score, rows) leaves to the k best rows; equal scores merge in row order."""
+    by_score: Dict[float, List[np.ndarray]] = {}
+    for score, rows in found:
+        by_score.setdefault(score, []).append(rows)
+    out: List[int] = []
+    for score in sorted(by_score, reverse=True):
+        out.extend(np.sort(np.concatenate(by_score[score]))[:k - len(out)].tolist())
+        if len(out) >= k:
+            break
+    return out
+
+
+def get_index(catalog: ItemCatalog) -> CatalogIndex:
+    """The index for this snapshot, built on first use."""
+    return catalog.derived("index", CatalogIndex)
+
+
+def select_outfit_rows_indexed(
+    catalog: ItemCatalog,
+    temp_f: float,
+    occasion: str,
+    condition: Optional[str] = None,
+    limit: int = 4,
+    alternatives: int = 0,
+) -> Tuple[List[int], Dict[str, List[int]]]:
+    """rules.select_outfit_rows, answered from the bucket index."""
+    index = get_index(catalog)
+
+    def top_rows(slot: Optional[str], k: int) -> List[int]:
+        return index.top_rows(slot, k, temp_f, occasion, condition)
+
+    return assemble_outfit(top_rows, catalog.ids, temp_f, limit, alternatives)
@@ -1,7 +1,14 @@
 import os
+import threading
+import time
+
 from dotenv import load_dotenv, find_dotenv
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, declarative_base, scoped_session
+from sqlalchemy.pool import QueuePool
+
+from backend import metrics
 
 load_dotenv(find_dotenv())  
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -9,14 +16,83 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set. Check your .env at repo root.")
 
-engine = create_engine(DATABASE_URL, future=True)
+# connection pool, per process: DB_POOL_SIZE kept open, up to DB_MAX_OVERFLOW
+# more under load; waiting longer than DB_POOL_TIMEOUT for one raises
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; -1 = never
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.stats = {"checkouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0, "failed_checkouts": 0}  # timeouts or connect errors
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.stats["failed_checkouts"] += 1
+            raise
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.stats["checkouts"] += 1
+            self.stats["wait_seconds_total"] += waited
+            self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+        return conn
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        capacity = self.size() + max(self._max_overflow, 0)
+        checked_out = self.checkedout()
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        stats.update(
+            size=self.size(),
+            max_overflow=self._max_overflow,
+            checked_out=checked_out,
+            idle=self.checkedin(),
+            overflow=max(self.overflow(), 0),
+            saturation=round(checked_out / capacity, 3) if capacity else None,
+        )
+        return stats
+
+
+def _pool_options(url):
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}  # in-memory SQLite keeps one connection per thread; nothing to tune
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+
+
+engine = create_engine(DATABASE_URL, future=True, **_pool_options(DATABASE_URL))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
+# one session per request thread; app.teardown_appcontext calls db_session.remove()
+db_session = scoped_session(SessionLocal)
+
+if isinstance(engine.pool, TimedQueuePool):
+    metrics.register("db_pool", lambda: engine.pool.snapshot())
+
 # simple helper for Flask routes
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,27 @@
+"""gunicorn settings for serving the API.
+
+    gunicorn -c backend/gunicorn.conf.py backend.app:app
+
+Workers are gevent by default: each request runs in a greenlet, and
+sockets (Open-Meteo calls through requests, Postgres through psycopg2
+once psycogreen patches it) yield to the other greenlets while they
+wait. A slow upstream then ties up memory for each waiting request,
+not one of a handful of OS threads, so it no longer blocks the whole
+pool. GUNICORN_WORKER_CLASS=sync (or gthread) goes back to thread-per-request.
+"""
+
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5050')}")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+# concurrent requests per gevent worker; DB_POOL_SIZE/DB_MAX_OVERFLOW still bound the queries
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "200"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        # psycopg2 is a C extension that gevent can't patch; without this a query blocks the worker
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
@@ -0,0 +1,212 @@
+"""Write-behind buffer for recommendation history.
+
+Request handlers hand rows to `writer.add()` and return right away with
+a reference generated here (a UUID stored in Recommendation.ref). A
+background thread drains the queue and writes rows with one bulk INSERT
+per batch: when `HISTORY_BATCH_SIZE` rows are waiting, or
+`HISTORY_FLUSH_INTERVAL` seconds after the oldest one arrived. Pending
+rows are flushed at interpreter exit.
+
+The queue is bounded. When it is full, add() waits up to
+`HISTORY_PUT_TIMEOUT` seconds and then writes the rows itself, so a
+slow database pushes back on requests instead of growing memory or
+dropping history. `HISTORY_WRITE_BEHIND=0` writes inline on every call.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, List
+
+from sqlalchemy import insert
+
+from backend import metrics
+from backend.db import SessionLocal
+from backend.models import Recommendation
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND = os.getenv("HISTORY_WRITE_BEHIND", "1") != "0"
+BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "200"))
+FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+PUT_TIMEOUT = float(os.getenv("HISTORY_PUT_TIMEOUT", "0.05"))
+
+_STOP = object()  # queued by close() to wake the worker
+
+
+def new_ref() -> str:
+    return str(uuid.uuid4())
+
+
+def write_rows(rows: List[Dict]) -> int:
+    """Bulk insert; if the batch fails (e.g. a user was deleted meanwhile), retry row by row. Rows written."""
+    db = SessionLocal()
+    try:
+        try:
+            db.execute(insert(Recommendation), rows)
+            db.commit()
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            logger.warning("history batch insert failed (%s); retrying row by row", e)
+        written = 0
+        for row in rows:
+            try:
+                db.execute(insert(Recommendation), [row])
+                db.commit()
+                written += 1
+            except Exception as e:
+                db.rollback()
+                logger.warning("dropping history row %s: %s", row.get("ref"), e)
+        return written
+    finally:
+        db.close()
+
+
+class HistoryWriter:
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, queue_size=QUEUE_SIZE,
+                 put_timeout=PUT_TIMEOUT, enabled=WRITE_BEHIND):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = os.getpid()
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "inline_writes": 0,    # rows written by the caller because the queue was full
+            "full_waits": 0,       # add() calls that found the queue full
+            "max_depth": 0,
+            "last_flush_seconds": None,
+        }
+
+    def add(self, rows: List[Dict]) -> List[str]:
+        """Queue history rows (Recommendation column dicts); returns their refs."""
+        for row in rows:
+            row.setdefault("ref", new_ref())
+        refs = [row["ref"] for row in rows]
+        if not self.enabled:
+            self._write(rows)
+            return refs
+
+        self._ensure_worker()
+        for n, row in enumerate(rows):
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                self._count("full_waits")
+                try:
+                    self._queue.put(row, timeout=self.put_timeout)
+                except queue.Full:
+                    # backpressure: the database is behind, write the rest here
+                    self._count("inline_writes", len(rows) - n)
+                    self._write(rows[n:])
+                    break
+            self._count("enqueued")
+        with self._lock:
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+        return refs
+
+    def flush(self) -> None:
+        """Write everything queued so far from the calling thread."""
+        with self._lock:
+            self._reset_if_forked()
+        while True:
+            batch, stop = self._take(self.batch_size, deadline=None)
+            if batch:
+                self._write(batch)
+            elif not stop:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "depth": self._queue.qsize(), "capacity": self._queue.maxsize}
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _reset_if_forked(self):
+        # threads don't survive a fork, and rows queued in the parent are
+        # the parent's to write: start over with an empty queue (lock held)
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._thread = None
+
+    def _ensure_worker(self):
+        with self._lock:
+            self._reset_if_forked()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+
+    def _take(self, limit, deadline, batch=None):
+        """
+        Up to `limit` rows; waits for more until `deadline` (None = don't
+        wait). Returns (rows, stop) where stop means close() was called.
+        """
+        batch = batch or []
+        while len(batch) < limit:
+            try:
+                if deadline is None:
+                    row = self._queue.get_nowait()
+                else:
+                    row = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if row is _STOP:
+                return batch, True
+            batch.append(row)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stop = self._take(self.batch_size, time.monotonic() + self.flush_interval, [first])
+            try:
+                self._write(batch)
+            except Exception:
+                # e.g. no database connection: lose this batch, not the worker
+                logger.exception("history batch of %d rows lost", len(batch))
+                self._count("failed", len(batch))
+
+    def _write(self, rows):
+        started = time.perf_counter()
+        written = write_rows(rows)
+        with self._lock:
+            self._stats["written"] += written
+            self._stats["failed"] += len(rows) - written
+            self._stats["batches"] += 1
+            self._stats["last_flush_seconds"] = round(time.perf_counter() - started, 6)
+
+    def close(self):
+        """Stop the worker and write what's left (registered with atexit)."""
+        with self._lock:
+            self._reset_if_forked()
+        if self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=5)
+            except queue.Full:
+                pass  # the worker is busy draining; flush() below picks up the rest
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+
+writer = HistoryWriter()
+atexit.register(writer.close)
+metrics.register("history", writer.stats)
@@ -0,0 +1,82 @@
+import json
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from sqlalchemy import select
+
+from backend.db import db_session
+from backend.models import Item
+from backend.request_args import int_arg
+
+items_bp = Blueprint("items", __name__)
+
+DEFAULT_LIMIT = 10  # what the endpoint returned before it was paged
+MAX_LIMIT = 5000
+ITEM_FIELDS = ("id", "name", "category", "formality", "warmth_score", "activity_comfort")
+DEFAULT_FIELDS = ("id", "name", "formality")
+STREAM_CHUNK = 500  # rows per chunk written to the response
+
+def _parse_fields():
+    raw = request.args.get("fields")
+    if not raw:
+        return DEFAULT_FIELDS
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in ITEM_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)} (allowed: {', '.join(ITEM_FIELDS)})")
+    # id is always returned: it is the pagination cursor
+    return tuple(dict.fromkeys(["id"] + fields))
+
+@items_bp.get("/items")
+def list_items():
+    """
+    Catalog listing, ordered by id, with keyset pagination.
+    ?after_id=<last id of the previous page>&limit=50 (max 5000)
+    Filters: category, formality, activity, warmth_min, warmth_max
+    ?fields=id,name,category only selects (and returns) those columns.
+    Response: a JSON array of items, streamed. When there may be more,
+    the X-Next-After-Id header holds the after_id for the next page.
+    """
+    try:
+        after_id = int_arg("after_id", 0)
+        limit = int_arg("limit", DEFAULT_LIMIT)
+        warmth_min = int_arg("warmth_min")
+        warmth_max = int_arg("warmth_max")
+        fields = _parse_fields()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not 1 <= limit <= MAX_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_LIMIT}"}), 400
+
+    # global catalog only; user-owned items are listed by /api/wardrobe
+    conditions = [Item.owner_id.is_(None), Item.id > after_id]
+    for arg, column in (("category", Item.category), ("formality", Item.formality), ("activity", Item.activity_comfort)):
+        if request.args.get(arg):
+            conditions.append(column == request.args[arg])
+    if warmth_min is not None:
+        conditions.append(Item.warmth_score >= warmth_min)
+    if warmth_max is not None:
+        conditions.append(Item.warmth_score <= warmth_max)
+    query = select(*[getattr(Item, f) for f in fields]).where(*conditions).order_by(Item.id).limit(limit)
+
+    db = db_session()
+    # headers go out before the streamed body, so look up the page's last id
+    # first (ids only, off the primary key); a full page may have more after it
+    next_after_id = db.execute(
+        select(Item.id).where(*conditions).order_by(Item.id).offset(limit - 1).limit(1)
+    ).scalar()
+
+    def generate():
+        # rows are fetched in batches and written as they come,
+        # so a large page is never held in memory as a whole
+        result = db.execute(query.execution_options(yield_per=STREAM_CHUNK))
+        yield "["
+        count = 0
+        for rows in result.partitions():
+            yield ("," if count else "") + ",".join(json.dumps(dict(zip(fields, row))) for row in rows)
+            count += len(rows)
+        yield "]"
+
+    headers = {}
+    if next_after_id is not None:
+        headers["X-Next-After-Id"] = str(next_after_id)
+    return Response(stream_with_context(generate()), mimetype="application/json", headers=headers)
@@ -0,0 +1,17 @@
+"""Process-local runtime metrics.
+
+Components register a function returning a JSON-serializable snapshot;
+/api/admin/metrics returns all of them. Values are per worker process.
+"""
+
+from typing import Callable, Dict
+
+_sources: Dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, snapshot: Callable[[], dict]) -> None:
+    _sources[name] = snapshot
+
+
+def snapshot() -> Dict[str, dict]:
+    return {name: fn() for name, fn in _sources.items()}
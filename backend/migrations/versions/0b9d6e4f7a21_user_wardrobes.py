@@ -0,0 +1,45 @@
+"""user-owned wardrobe items
+
+Revision ID: 0b9d6e4f7a21
+Revises: e5b0f3a87c42
+Create Date: 2026-10-18 19:26:40.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9d6e4f7a21'
+down_revision: Union[str, Sequence[str], None] = 'e5b0f3a87c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    # create_all (app.py) makes owner_id with its key and index, and the new table, on fresh databases
+    if 'owner_id' not in {c['name'] for c in inspector.get_columns('items')}:
+        # batch mode so the foreign key also works on SQLite
+        with op.batch_alter_table('items') as batch_op:
+            batch_op.add_column(sa.Column('owner_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_items_owner_id_users', 'users', ['owner_id'], ['id'])
+            batch_op.create_index(batch_op.f('ix_items_owner_id'), ['owner_id'])
+    if not inspector.has_table('wardrobe_versions'):
+        op.create_table(
+            'wardrobe_versions',
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+            sa.Column('version', sa.Integer(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('wardrobe_versions')
+    with op.batch_alter_table('items') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_items_owner_id'))
+        batch_op.drop_constraint('fk_items_owner_id_users', type_='foreignkey')
+        batch_op.drop_column('owner_id')
@@ -0,0 +1,39 @@
+"""add catalog_version change marker
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-18 09:12:41.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9b7d10'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # app.py's create_all may already have made the table (dev databases)
+    if not sa.inspect(op.get_bind()).has_table('catalog_version'):
+        op.create_table(
+            'catalog_version',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    op.execute(
+        "INSERT INTO catalog_version (id, version) SELECT 1, 1"
+        " WHERE NOT EXISTS (SELECT 1 FROM catalog_version WHERE id = 1)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalog_version')
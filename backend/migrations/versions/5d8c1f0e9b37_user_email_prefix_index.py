@@ -0,0 +1,40 @@
+"""index users.email for prefix search
+
+Revision ID: 5d8c1f0e9b37
+Revises: 0b9d6e4f7a21
+Create Date: 2026-10-18 21:03:12.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8c1f0e9b37'
+down_revision: Union[str, Sequence[str], None] = '0b9d6e4f7a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only Postgres needs it: its default collation keeps ix_users_email out of
+    # LIKE 'abc%' plans, pattern ops don't. Elsewhere it would just duplicate ix_users_email.
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    if 'ix_users_email_prefix' in {i['name'] for i in sa.inspect(bind).get_indexes('users')}:
+        return
+    op.create_index(
+        'ix_users_email_prefix',
+        'users',
+        ['email'],
+        postgresql_ops={'email': 'text_pattern_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS ix_users_email_prefix')
@@ -0,0 +1,40 @@
+"""store resolved coordinates on profiles
+
+Revision ID: 8a4e6d2c51f3
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-18 11:02:17.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e6d2c51f3'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a9b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # skip columns create_all already made (databases first created by app.py)
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('profiles')}
+    for column in (
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('timezone', sa.String(length=64), nullable=True),
+        sa.Column('resolved_location', sa.JSON(), nullable=True),
+    ):
+        if column.name not in existing:
+            op.add_column('profiles', column)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('profiles', 'resolved_location')
+    op.drop_column('profiles', 'timezone')
+    op.drop_column('profiles', 'longitude')
+    op.drop_column('profiles', 'latitude')
@@ -0,0 +1,33 @@
+"""add client-facing ref to recommendations
+
+Revision ID: c27d94e1a6b8
+Revises: 8a4e6d2c51f3
+Create Date: 2026-10-18 15:40:52.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27d94e1a6b8'
+down_revision: Union[str, Sequence[str], None] = '8a4e6d2c51f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if 'ref' not in {c['name'] for c in inspector.get_columns('recommendations')}:
+        op.add_column('recommendations', sa.Column('ref', sa.String(length=36), nullable=True))
+    if 'ix_recommendations_ref' not in {i['name'] for i in inspector.get_indexes('recommendations')}:
+        op.create_index(op.f('ix_recommendations_ref'), 'recommendations', ['ref'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_recommendations_ref'), table_name='recommendations')
+    op.drop_column('recommendations', 'ref')
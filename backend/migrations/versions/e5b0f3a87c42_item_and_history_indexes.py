@@ -0,0 +1,37 @@
+"""index items for filtering and recommendations per user
+
+Revision ID: e5b0f3a87c42
+Revises: c27d94e1a6b8
+Create Date: 2026-10-18 17:12:05.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b0f3a87c42'
+down_revision: Union[str, Sequence[str], None] = 'c27d94e1a6b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if 'ix_items_category_formality_activity_warmth' not in {i['name'] for i in inspector.get_indexes('items')}:
+        op.create_index(
+            'ix_items_category_formality_activity_warmth',
+            'items',
+            ['category', 'formality', 'activity_comfort', 'warmth_score'],
+        )
+    if 'ix_recommendations_user_id_id' not in {i['name'] for i in inspector.get_indexes('recommendations')}:
+        op.create_index('ix_recommendations_user_id_id', 'recommendations', ['user_id', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recommendations_user_id_id', table_name='recommendations')
+    op.drop_index('ix_items_category_formality_activity_warmth', table_name='items')
@@ -2,7 +2,7 @@
 Instances of these classes will be loaded from database
 We can change this as needed  """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Enum, Float, Index
 from sqlalchemy.orm import relationship
 from backend.db import Base
 import enum
@@ -18,12 +18,18 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     role = Column(Enum(RoleEnum), nullable=False, default=RoleEnum.member)
     profile = relationship("Profile", back_populates="user", uselist=False)
+    # Postgres also gets ix_users_email_prefix for admin prefix search (migration 5d8c1f0e9b37)
 
 class Profile(Base):
     __tablename__ = "profiles"
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
     location_text = Column(String(255))
     units = Column(String(1), default="F")  # 'F' or 'C'
+    # location_text geocoded once when it changes (None if it couldn't be resolved yet)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    timezone = Column(String(64))
+    resolved_location = Column(JSON)      # name/country/admin1 for display
     user = relationship("User", back_populates="profile")
 
 class Item(Base):
@@ -34,11 +40,33 @@ class Item(Base):
     formality = Column(String(40))        # casual|business|formal|workout...
     warmth_score = Column(Integer)        # e.g., 1-10
     activity_comfort = Column(String(80)) # indoor|outdoor|workout...
+    owner_id = Column(Integer, ForeignKey("users.id", name="fk_items_owner_id_users"), index=True)  # None = global catalog, else a user's wardrobe
+
+    __table_args__ = (
+        Index("ix_items_category_formality_activity_warmth", "category", "formality", "activity_comfort", "warmth_score"),
+    )
+
+class CatalogVersion(Base):
+    """Single-row change marker for the items table (bumped on every item write)."""
+    __tablename__ = "catalog_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class WardrobeVersion(Base):
+    """Per-user change marker for wardrobe items (like CatalogVersion for the global catalog)."""
+    __tablename__ = "wardrobe_versions"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
 
 class Recommendation(Base):
     __tablename__ = "recommendations"
     id = Column(Integer, primary_key=True)
+    ref = Column(String(36), unique=True, index=True)  # UUID handed to the client before the row is written
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     occasion = Column(String(80), nullable=False)
     weather_snapshot = Column(JSON)       # store the API response summary
-    outfit = Column(JSON)                 # list of item ids/names
\ No newline at end of file
+    outfit = Column(JSON)                 # list of item ids/names
+
+    __table_args__ = (
+        Index("ix_recommendations_user_id_id", "user_id", "id"),  # a user's history, newest first
+    )
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""Precomputed outfits for every distinct input to pick_outfit.
+
+pick_outfit only depends on temp_f through the warmth band and the
+outerwear / sunny-hot thresholds (see rules.outfit_key), so for a given
+catalog there are only ~125 distinct outfits. OutfitTable computes all
+of them once per catalog snapshot and answers requests with a dict lookup.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.catalog import ItemCatalog, ItemLike
+from backend.catalog_index import get_index, select_outfit_rows_indexed
+from backend.rules import (
+    OCCASION_PROFILES,
+    SCORED_CONDITIONS,
+    TEMP_BREAKPOINTS,
+    OutfitKey,
+    assemble_outfit,
+    outfit_key,
+    score_catalog,
+    score_item,
+    top_k_rows,
+)
+
+DEFAULT_LIMIT = 4
+# runner-ups stored per slot; requests asking for more fall back to live scoring
+TABLE_ALTERNATIVES = 5
+
+Outfit = Tuple[List[ItemLike], Dict[str, List[ItemLike]]]
+
+
+def representative_temps() -> List[float]:
+    """One temperature inside each interval between TEMP_BREAKPOINTS."""
+    edges = sorted(TEMP_BREAKPOINTS)
+    return [edges[0] - 1] + edges
+
+
+class OutfitTable:
+    """
+    outfit_key -> (outfit rows, runner-up rows per slot) for one catalog
+    snapshot. Rows are indices into catalog.items.
+    """
+
+    def __init__(self, catalog: ItemCatalog, limit: int = DEFAULT_LIMIT):
+        self.catalog = catalog
+        self.limit = limit
+        self.rows: Dict[OutfitKey, Tuple[List[int], Dict[str, List[int]]]] = {}
+
+        occasions = list(OCCASION_PROFILES) + [""]
+        conditions = [""] + list(SCORED_CONDITIONS)
+        for temp_f in representative_temps():
+            for occasion in occasions:
+                for condition in conditions:
+                    key = outfit_key(temp_f, occasion, condition)
+                    if key not in self.rows:
+                        self.rows[key] = select_outfit_rows_indexed(
+                            catalog, temp_f, occasion, condition, limit, TABLE_ALTERNATIVES
+                        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def lookup(
+        self,
+        temp_f: float,
+        occasion: str,
+        condition: Optional[str] = None,
+        alternatives: int = 0,
+    ) -> Optional[Outfit]:
+        """The precomputed outfit, or None if this input isn't covered (e.g. NaN temp)."""
+        entry = self.rows.get(outfit_key(temp_f, occasion, condition))
+        if entry is None:
+            return None
+        return _to_items(self.catalog.items, *entry, alternatives)
+
+
+def get_outfit_table(catalog: ItemCatalog) -> OutfitTable:
+    """The table for this snapshot, built on first use."""
+    return catalog.derived("outfit_table", OutfitTable)
+
+
+def _to_items(items: Sequence[ItemLike], rows: List[int], alts: Dict[str, List[int]], alternatives: int) -> Outfit:
+    return (
+        [items[i] for i in rows],
+        {slot: [items[i] for i in alt_rows[:alternatives]] for slot, alt_rows in alts.items()},
+    )
+
+
+class _Concat(Sequence):
+    """Read-only view of two sequences back to back (rows of catalog, then wardrobe)."""
+
+    def __init__(self, first: Sequence, second: Sequence):
+        self.first = first
+        self.second = second
+
+    def __len__(self) -> int:
+        return len(self.first) + len(self.second)
+
+    def __getitem__(self, row: int):
+        row = int(row)
+        if row < len(self.first):
+            return self.first[row]
+        return self.second[row - len(self.first)]
+
+
+def select_union_rows(
+    catalog: ItemCatalog,
+    wardrobe: ItemCatalog,
+    temp_f: float,
+    occasion: str,
+    condition: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+    alternatives: int = 0,
+) -> Tuple[List[int], Dict[str, List[int]]]:
+    """
+    select_outfit_rows over the global catalog plus a user's wardrobe, as
+    if the wardrobe items were appended after the catalog (rows >=
+    len(catalog) are wardrobe rows). The catalog side only asks its index
+    for its k best rows, so the cost follows the wardrobe size.
+    """
+    index = get_index(catalog)
+    scores = score_catalog(wardrobe, temp_f, occasion, condition)
+    candidates = np.flatnonzero(scores > 0)
+    offset = len(catalog)
+
+    def top_rows(slot: Optional[str], k: int) -> List[int]:
+        found = [
+            (score_item(catalog.items[row], temp_f, occasion, condition), row)
+            for row in index.top_rows(slot, k, temp_f, occasion, condition)
+        ]
+        rows = candidates
+        if slot is not None:
+            rows = rows[wardrobe.slot_codes[rows] == wardrobe.slot_code(slot)]
+        found += [(scores[row], offset + row) for row in top_k_rows(scores, rows, k).tolist()]
+        # best first, ties in union order
+        found.sort(key=lambda x: (-x[0], x[1]))
+        return [row for _, row in found[:k]]
+
+    return assemble_outfit(top_rows, _Concat(catalog.ids, wardrobe.ids), temp_f, limit, alternatives)
+
+
+def recommend(
+    catalog: ItemCatalog,
+    temp_f: float,
+    occasion: str,
+    condition: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+    alternatives: int = 0,
+    wardrobe: Optional[ItemCatalog] = None,
+) -> Outfit:
+    """
+    (outfit, runner-ups per slot) via the precomputed table, falling back
+    to live scoring for inputs the table doesn't cover. With a non-empty
+    `wardrobe` (see catalog.get_wardrobe), picks from the catalog and the
+    wardrobe together.
+    """
+    alternatives = max(alternatives, 0)
+    if wardrobe is not None and len(wardrobe):
+        rows, alts = select_union_rows(catalog, wardrobe, temp_f, occasion, condition, limit, alternatives)
+        return _to_items(_Concat(catalog.items, wardrobe.items), rows, alts, alternatives)
+    if limit == DEFAULT_LIMIT and alternatives <= TABLE_ALTERNATIVES:
+        outfit = get_outfit_table(catalog).lookup(temp_f, occasion, condition, alternatives)
+        if outfit is not None:
+            return outfit
+    rows, alts = select_outfit_rows_indexed(catalog, temp_f, occasion, condition, limit, alternatives)
+    return _to_items(catalog.items, rows, alts, alternatives)
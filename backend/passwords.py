@@ -0,0 +1,172 @@
+"""Password hashing off the request threads.
+
+bcrypt is deliberately slow (~250ms at cost 12), so hashes and checks
+run in a small process pool instead of on the worker's request thread.
+At most PASSWORD_WORKERS + PASSWORD_QUEUE operations are admitted at
+once per worker process; past that, calls raise Saturated right away
+(the routes answer 429) instead of queueing behind an auth storm.
+
+The cost factor is BCRYPT_ROUNDS. Hashes made with another cost still
+verify, and login re-hashes them at the current cost (needs_rehash).
+PASSWORD_WORKERS=0 hashes inline (handy for scripts and local dev).
+
+Each process starts its own pool on its first hash or check (importing
+this module forks nothing), and starts a new one if it finds itself in
+a forked child.
+"""
+
+import atexit
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+import time
+
+from passlib.hash import bcrypt
+
+from backend import metrics
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(os.cpu_count() or 1, 4))))
+QUEUE = int(os.getenv("PASSWORD_QUEUE", str(max(WORKERS, 1) * 4)))  # admitted beyond the running ones
+TIMEOUT = float(os.getenv("PASSWORD_TIMEOUT", "5"))  # seconds one call may wait for its result
+
+_hasher = bcrypt.using(rounds=BCRYPT_ROUNDS)
+
+
+class Saturated(Exception):
+    """Too many hash operations in flight (or one timed out); try again shortly."""
+
+
+# ---- run in the pool processes ----
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return bcrypt.verify(password, password_hash)
+
+
+# ---- request side ----
+
+class _Pool:
+    """Lazily started process pool (recreated after a fork or a crashed child)."""
+
+    def __init__(self, workers: int, queue: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"rejected": 0, "timeouts": 0, "in_flight": 0}
+        self._latency = {}  # op -> [count, total seconds, max seconds]
+
+    def _get(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # fork where we can: spawn and forkserver re-import the app's __main__ in
+                # every child. Load the bcrypt backend first so the children inherit it
+                # and never import anything while another thread may hold a lock.
+                _hasher.get_backend()
+                method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+                ctx = multiprocessing.get_context(method)
+                self._executor = concurrent.futures.ProcessPoolExecutor(self.workers, mp_context=ctx)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _reset(self, executor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def _record(self, op: str, seconds: float) -> None:
+        with self._stats_lock:
+            entry = self._latency.setdefault(op, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def call(self, op: str, fn, *args):
+        """fn(*args) in the pool; Saturated if no slot is free or the result doesn't come in time."""
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            raise Saturated(f"too many password operations in flight ({op})")
+
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._stats["in_flight"] += 1
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._release()
+                self._record(op, time.perf_counter() - started)
+
+        executor = self._get()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # the slot is held until the work is done, even if this request gave up on it
+        future.add_done_callback(lambda _: self._release())
+        try:
+            result = future.result(TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            with self._stats_lock:
+                self._stats["timeouts"] += 1
+            raise Saturated(f"password {op} timed out")
+        except concurrent.futures.process.BrokenProcessPool:
+            self._reset(executor)
+            raise
+        self._record(op, time.perf_counter() - started)
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _release(self) -> None:
+        with self._stats_lock:
+            self._stats["in_flight"] -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            latency = {
+                op: {
+                    "count": count,
+                    "seconds_avg": total / count if count else 0.0,
+                    "seconds_max": worst,
+                }
+                for op, (count, total, worst) in self._latency.items()
+            }
+            return dict(self._stats, workers=self.workers, capacity=max(self.workers, 1) + QUEUE,
+                        rounds=BCRYPT_ROUNDS, latency=latency)
+
+
+_pool = _Pool(WORKERS, QUEUE)
+
+
+def hash_password(password: str) -> str:
+    """bcrypt hash at the current cost factor. Raises Saturated."""
+    return _pool.call("hash", _hash, password, BCRYPT_ROUNDS)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Raises Saturated."""
+    return _pool.call("verify", _verify, password, password_hash)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """True if the hash was made with a different cost (cheap: parses the hash only)."""
+    return _hasher.needs_update(password_hash)
+
+
+atexit.register(_pool.shutdown)
+metrics.register("passwords", _pool.stats)
@@ -0,0 +1,87 @@
+"""Turn an hourly forecast into a short list of outfit segments.
+
+Consecutive hours with the same rules.outfit_key always get the same
+outfit, so a 24h forecast usually collapses to a handful of segments
+and costs one outfit lookup per segment instead of one per hour. Each
+segment after the first carries the delta from the previous one
+(e.g. "add outerwear at 18:00").
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from backend.catalog import ItemCatalog
+from backend.outfit_table import recommend
+from backend.rules import outfit_key
+
+
+def condition_from_weather_code(code: Optional[int]) -> str:
+    """Map a WMO weather code (Open-Meteo `weather_code`) to our condition labels."""
+    if code is None:
+        return "Clear"
+    code = int(code)
+    if code in (0, 1):
+        return "Clear"
+    if code in (2, 3, 45, 48):
+        return "Cloudy"
+    if 71 <= code <= 77 or code in (85, 86):
+        return "Snowy"
+    if 51 <= code <= 67 or 80 <= code <= 82 or code >= 95:
+        return "Rainy"
+    return "Clear"
+
+
+def build_plan(
+    catalog: ItemCatalog,
+    times: Sequence[str],
+    temps_f: Sequence[Optional[float]],
+    conditions: Sequence[str],
+    occasion: str,
+) -> List[Dict]:
+    """
+    One entry per segment of consecutive hours that share an outfit:
+      {start, end, hours, temp_min_f, temp_max_f, conditions, items, changes}
+    `items` are catalog items (ItemRecords for the cached catalog); `changes` is None for the first segment,
+    else {"added": [...], "removed": [...]} relative to the previous one.
+    Hours with no temperature are skipped.
+    """
+    segments: List[Dict] = []
+    outfits = {}  # outfit_key -> items, resolved once per distinct key
+
+    for time, temp_f, condition in zip(times, temps_f, conditions):
+        if temp_f is None:
+            continue
+        key = outfit_key(temp_f, occasion, condition)
+        if key not in outfits:
+            outfits[key] = recommend(catalog, temp_f, occasion, condition)[0]
+        items = outfits[key]
+
+        last = segments[-1] if segments else None
+        if last is not None and [i.id for i in last["items"]] == [i.id for i in items]:
+            last["end"] = time
+            last["hours"] += 1
+            last["temp_min_f"] = min(last["temp_min_f"], temp_f)
+            last["temp_max_f"] = max(last["temp_max_f"], temp_f)
+            if condition not in last["conditions"]:
+                last["conditions"].append(condition)
+            continue
+
+        changes = None
+        if last is not None:
+            before = {i.id for i in last["items"]}
+            after = {i.id for i in items}
+            changes = {
+                "added": [i for i in items if i.id not in before],
+                "removed": [i for i in last["items"] if i.id not in after],
+            }
+        segments.append({
+            "start": time,
+            "end": time,
+            "hours": 1,
+            "temp_min_f": temp_f,
+            "temp_max_f": temp_f,
+            "conditions": [condition],
+            "items": items,
+            "changes": changes,
+        })
+
+    return segments
@@ -1,66 +1,274 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from backend.db import SessionLocal
-from backend.models import Item, Recommendation
-from backend.rules import pick_outfit
+from backend.db import db_session
+from backend.models import Profile
+from backend.history import writer as history
+from backend.catalog import get_catalog, get_wardrobe
+from backend.outfit_table import get_outfit_table, recommend
+from backend.planner import condition_from_weather_code
+from backend.rules import outfit_key
+from backend import weather
 
 rec_bp = Blueprint("recommendations", __name__)
 
-@rec_bp.post("/recommendations")
-@jwt_required(optional=True)
-def get_recommendations():
-    data = request.get_json(force=True) or {}
+MAX_ALTERNATIVES = 10
+MAX_BATCH = 200  # e.g. a week of hourly temps, or 7 days x 4 occasions with room to spare
+
+# runs the dashboard's upstream weather fetch while the request thread loads the catalog
+_weather_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DASHBOARD_WEATHER_THREADS", "8")),
+    thread_name_prefix="dashboard-weather",
+)
 
+def _item_json(i):
+    return {
+        "id": i.id,
+        "name": i.name,
+        "category": i.category,
+        "formality": i.formality,
+        "warmth_score": i.warmth_score,
+        "activity_comfort": i.activity_comfort,
+    }
+
+def _parse_scenario(data):
+    """(occasion, temp_f, condition, alternatives) from a request body; ValueError if invalid."""
     occasion = (data.get("occasion") or "casual_outing").strip()
     temp_f = data.get("temp_f")
     condition = data.get("condition")  # <-- NEW
+    # number of runner-up items to return per slot (for swapping in the UI)
+    try:
+        alternatives = max(0, min(int(data.get("alternatives") or 0), MAX_ALTERNATIVES))
+    except (TypeError, ValueError):
+        raise ValueError("alternatives must be an integer")
 
     if temp_f is None:
-        return jsonify({"error": "temp_f is required for now"}), 400
+        raise ValueError("temp_f is required for now")
+    try:
+        temp_f = float(temp_f)
+    except (TypeError, ValueError):
+        raise ValueError("temp_f must be a number")
+
+    return occasion, temp_f, condition, alternatives
+
+def _outfit_json(occasion, temp_f, condition, alternatives, outfit_items, alts):
+    body = {
+        "occasion": occasion,
+        "temp_f": temp_f,
+        "condition": condition,
+        "items": [_item_json(i) for i in outfit_items],
+    }
+    if alternatives:
+        body["alternatives"] = {
+            slot: [_item_json(i) for i in items] for slot, items in alts.items()
+        }
+    return body
 
-    temp_f = float(temp_f)
+def _history_row(user_id, occasion, temp_f, condition, outfit_items):
+    return {
+        "user_id": int(user_id),
+        "occasion": occasion,
+        "weather_snapshot": {"temp_f": temp_f, "condition": condition},
+        "outfit": [{"id": i.id, "name": i.name} for i in outfit_items],
+    }
 
-    db = SessionLocal()
+@rec_bp.post("/recommendations")
+@jwt_required(optional=True)
+def get_recommendations():
+    data = request.get_json(force=True) or {}
     try:
-        items = db.query(Item).all()
-        outfit_items = pick_outfit(
-            items,
-            temp_f=temp_f,
-            occasion=occasion,
-            condition=condition,
-            limit=4,
-        )
-
-        # (optional) save to Recommendation if user is logged in
-        user_id = get_jwt_identity()
-        rec_row = None
-        if user_id is not None:
-            rec_row = Recommendation(
-                user_id=int(user_id),
+        occasion, temp_f, condition, alternatives = _parse_scenario(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    user_id = get_jwt_identity()
+    db = db_session()
+    catalog = get_catalog(db)
+    # logged-in users also get picks from their own wardrobe
+    wardrobe = get_wardrobe(db, user_id) if user_id is not None else None
+    outfit_items, alts = recommend(
+        catalog,
+        temp_f=temp_f,
+        occasion=occasion,
+        condition=condition,
+        limit=4,
+        alternatives=alternatives,
+        wardrobe=wardrobe,
+    )
+
+    # (optional) save to Recommendation if user is logged in; written in the background
+    ref = None
+    if user_id is not None:
+        [ref] = history.add([_history_row(user_id, occasion, temp_f, condition, outfit_items)])
+
+    body = _outfit_json(occasion, temp_f, condition, alternatives, outfit_items, alts)
+    body["saved_recommendation_id"] = ref
+    return jsonify(body)
+
+@rec_bp.post("/recommendations/batch")
+@jwt_required(optional=True)
+def get_recommendations_batch():
+    """
+    Many recommendations in one call, e.g. a week of days x occasions.
+    Body: {"requests": [{"temp_f", "occasion", "condition", "alternatives"}, ...]}
+    Results come back in request order.
+    """
+    data = request.get_json(force=True) or {}
+    scenarios = data.get("requests")
+    if not isinstance(scenarios, list) or not scenarios:
+        return jsonify({"error": "requests must be a non-empty list"}), 400
+    if len(scenarios) > MAX_BATCH:
+        return jsonify({"error": f"at most {MAX_BATCH} requests per batch"}), 400
+
+    parsed = []
+    for n, scenario in enumerate(scenarios):
+        try:
+            if not isinstance(scenario, dict):
+                raise ValueError("each request must be an object")
+            parsed.append(_parse_scenario(scenario))
+        except ValueError as e:
+            return jsonify({"error": str(e), "index": n}), 400
+
+    user_id = get_jwt_identity()
+    db = db_session()
+    catalog = get_catalog(db)
+    wardrobe = get_wardrobe(db, user_id) if user_id is not None else None
+
+    # Scenarios with the same outfit_key get the same outfit, so each
+    # distinct key is resolved once (usually a table lookup).
+    outfits = {}
+    results = []
+    for occasion, temp_f, condition, alternatives in parsed:
+        key = (outfit_key(temp_f, occasion, condition), alternatives)
+        if key not in outfits:
+            outfits[key] = recommend(
+                catalog,
+                temp_f=temp_f,
                 occasion=occasion,
-                weather_snapshot={"temp_f": temp_f, "condition": condition},
-                outfit=[{"id": i.id, "name": i.name} for i in outfit_items],
+                condition=condition,
+                limit=4,
+                alternatives=alternatives,
+                wardrobe=wardrobe,
             )
-            db.add(rec_row)
-            db.commit()
-
-        return jsonify({
-            "occasion": occasion,
-            "temp_f": temp_f,
-            "condition": condition,
-            "items": [
-                {
-                    "id": i.id,
-                    "name": i.name,
-                    "category": i.category,
-                    "formality": i.formality,
-                    "warmth_score": i.warmth_score,
-                    "activity_comfort": i.activity_comfort,
-                }
-                for i in outfit_items
-            ],
-            "saved_recommendation_id": rec_row.id if rec_row else None,
-        })
-    finally:
-        db.close()
\ No newline at end of file
+        results.append(outfits[key])
+
+    bodies = [
+        _outfit_json(occasion, temp_f, condition, alternatives, *result)
+        for (occasion, temp_f, condition, alternatives), result in zip(parsed, results)
+    ]
+
+    # (optional) save every result; batched into bulk inserts in the background
+    saved_ids = [None] * len(bodies)
+    if user_id is not None:
+        saved_ids = history.add([
+            _history_row(user_id, occasion, temp_f, condition, outfit_items)
+            for (occasion, temp_f, condition, _), (outfit_items, _) in zip(parsed, results)
+        ])
+
+    for body, rec_id in zip(bodies, saved_ids):
+        body["saved_recommendation_id"] = rec_id
+    return jsonify({"results": bodies})
+
+def _dashboard_weather(location, lat, lon, timezone):
+    """(best geocode match or None, forecast) for the dashboard; geocodes only if lat/lon unknown."""
+    best = None
+    if lat is None:
+        best = weather.geocode(location)
+        if not best:
+            return None, None
+        lat, lon = best["latitude"], best["longitude"]
+    # always Fahrenheit: the rules score in F; display units are converted below
+    data = weather.fetch_forecast(lat, lon, weather.current_temp_params("f", timezone))
+    return best, data
+
+def _display_temp(temp_f, units):
+    if temp_f is None or units != "C":
+        return temp_f
+    return round((temp_f - 32) * 5 / 9, 1)
+
+@rec_bp.get("/dashboard")
+@jwt_required()
+def get_dashboard():
+    """
+    Saved-location weather plus an outfit for it, in one call.
+    The upstream weather fetch runs while the catalog is loaded.
+    Query: ?occasion=casual_outing&timezone=auto&alternatives=0
+    """
+    occasion = (request.args.get("occasion") or "casual_outing").strip()
+    timezone = request.args.get("timezone", "auto")
+    try:
+        alternatives = max(0, min(int(request.args.get("alternatives") or 0), MAX_ALTERNATIVES))
+    except ValueError:
+        return jsonify({"error": "alternatives must be an integer"}), 400
+
+    user_id = get_jwt_identity()
+    db = db_session()
+    profile = db.query(Profile).filter_by(user_id=int(user_id)).first()
+    if not profile or not profile.location_text or profile.location_text.strip() == "":
+        return jsonify({"error": "No saved location found", "code": "NO_LOCATION"}), 404
+    location = profile.location_text.strip()
+    pending = _weather_pool.submit(_dashboard_weather, location, profile.latitude, profile.longitude, timezone)
+    # read now: rollback expires the profile, and touching it afterwards would query again
+    user_units, resolved, profile_timezone = profile.units, profile.resolved_location, profile.timezone
+
+    # overlaps with the upstream call: load the catalog, its outfit table and the wardrobe
+    try:
+        catalog = get_catalog(db)
+        get_outfit_table(catalog)
+        wardrobe = get_wardrobe(db, user_id)
+    except Exception:
+        pending.cancel()
+        raise
+    # end the read transaction: don't hold a pooled connection while waiting on upstream
+    db.rollback()
+
+    try:
+        best, data = pending.result()
+    except requests.exceptions.HTTPError as e:
+        status = getattr(e.response, "status_code", 502)
+        return jsonify({"error": "Upstream error", "details": str(e)}), status
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": "Network error", "details": str(e)}), 502
+
+    if data is None:
+        return jsonify({"error": "Could not geocode saved location", "location": location}), 404
+    if best is not None:
+        weather.store_resolved_location(profile, best)
+        resolved, profile_timezone = profile.resolved_location, profile.timezone
+
+    temp_f, _, high_f, low_f = weather.parse_current_temp(data)
+    if temp_f is None:
+        return jsonify({"error": "Upstream returned no current temperature"}), 502
+    condition = condition_from_weather_code((data.get("current") or {}).get("weather_code"))
+
+    outfit_items, alts = recommend(
+        catalog,
+        temp_f=temp_f,
+        occasion=occasion,
+        condition=condition,
+        limit=4,
+        alternatives=alternatives,
+        wardrobe=wardrobe,
+    )
+    if best is not None:
+        db.commit()
+    [ref] = history.add([_history_row(user_id, occasion, temp_f, condition, outfit_items)])
+
+    units = (user_units or "F").upper()
+    body = _outfit_json(occasion, temp_f, condition, alternatives, outfit_items, alts)
+    body["saved_recommendation_id"] = ref
+    body["weather"] = {
+        "current_temperature": _display_temp(temp_f, units),
+        "temperature_high": _display_temp(high_f, units),
+        "temperature_low": _display_temp(low_f, units),
+        "temperature_unit": "°C" if units == "C" else "°F",
+        "user_units": user_units,
+        "weather_code": (data.get("current") or {}).get("weather_code"),
+        "_resolved_location": resolved,
+        "timezone": profile_timezone,
+    }
+    return jsonify(body)
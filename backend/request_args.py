@@ -0,0 +1,14 @@
+"""Query-string parsing shared by the blueprints."""
+
+from flask import request
+
+
+def int_arg(name, default=None):
+    """?name=<int> as an int, `default` if absent or empty; ValueError (with a message for the client) otherwise."""
+    value = request.args.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
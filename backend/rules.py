@@ -1,8 +1,10 @@
 # backend/rules.py
 
-from typing import List, Dict, Optional
-from collections import defaultdict
-from backend.models import Item
+from typing import Callable, List, Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.catalog import ItemCatalog, ItemLike
 
 # Map occasions to desired formality + activity_comfort
 OCCASION_PROFILES: Dict[str, Dict[str, str]] = {
@@ -12,6 +14,18 @@ OCCASION_PROFILES: Dict[str, Dict[str, str]] = {
     "workout":       {"formality": "workout", "activity": "workout"},
 }
 
+# Conditions that change scores (anything else scores like no condition)
+SCORED_CONDITIONS = ("sunny", "rainy", "snowy")
+
+OUTERWEAR_BELOW_F = 65  # pick_outfit adds outerwear below this
+SUNNY_HOT_F = 85        # sunny + at least this hot -> penalize warm items
+
+# Every temperature where pick_outfit's result can change:
+# the temp_to_warmth_band edges plus the two thresholds above.
+TEMP_BREAKPOINTS: Tuple[float, ...] = (45, 60, OUTERWEAR_BELOW_F, 75, SUNNY_HOT_F, 90)
+
+OutfitKey = Tuple[int, bool, bool, str, str]
+
 def temp_to_warmth_band(temp_f: float) -> int:
     """
     Convert temperature into a target warmth_score (very rough).
@@ -31,8 +45,32 @@ def temp_to_warmth_band(temp_f: float) -> int:
         return 7
     return 9
 
+def match_bonuses(
+    formality: Optional[str],
+    activity: Optional[str],
+    occasion: str,
+) -> Tuple[float, float]:
+    """(formality_bonus, activity_bonus) for an item with these attributes."""
+    profile = OCCASION_PROFILES.get(occasion, {})
+    desired_formality = profile.get("formality")
+    desired_activity = profile.get("activity")
+
+    formality_bonus = 0.0
+    if desired_formality and formality:
+        if formality == desired_formality:
+            formality_bonus = 3.0
+        elif formality in ("casual", "business") and desired_formality in ("casual", "business"):
+            formality_bonus = 1.0
+
+    activity_bonus = 0.0
+    if desired_activity and activity:
+        if activity == desired_activity:
+            activity_bonus = 2.0
+
+    return formality_bonus, activity_bonus
+
 def score_item(
-    item: Item,
+    item: ItemLike,
     temp_f: float,
     occasion: str,
     condition: Optional[str] = None,
@@ -51,21 +89,7 @@ def score_item(
     target_warmth = temp_to_warmth_band(temp_f)
     warmth_penalty = abs(item.warmth_score - target_warmth)
 
-    profile = OCCASION_PROFILES.get(occasion, {})
-    desired_formality = profile.get("formality")
-    desired_activity = profile.get("activity")
-
-    formality_bonus = 0.0
-    if desired_formality and item.formality:
-        if item.formality == desired_formality:
-            formality_bonus = 3.0
-        elif item.formality in ("casual", "business") and desired_formality in ("casual", "business"):
-            formality_bonus = 1.0
-
-    activity_bonus = 0.0
-    if desired_activity and item.activity_comfort:
-        if item.activity_comfort == desired_activity:
-            activity_bonus = 2.0
+    formality_bonus, activity_bonus = match_bonuses(item.formality, item.activity_comfort, occasion)
 
     # Base score
     score = 10.0
@@ -77,7 +101,7 @@ def score_item(
     if condition:
         condition = condition.lower()
         # Very hot & sunny -> penalize warm items
-        if condition == "sunny" and temp_f >= 85:
+        if condition == "sunny" and temp_f >= SUNNY_HOT_F:
             if item.warmth_score >= 6:
                 score -= 3.0
         # Rainy -> small bonus for boots, outerwear
@@ -95,73 +119,268 @@ def score_item(
 
     return score
 
-def pick_outfit(
-    items: List[Item],
+def outfit_key(temp_f: float, occasion: str, condition: Optional[str] = None) -> OutfitKey:
+    """
+    Everything pick_outfit's result depends on besides the catalog:
+    (warmth band, outerwear needed, sunny & hot, occasion, condition).
+    Unknown occasions/conditions collapse to "" since they score the same.
+    """
+    cond = (condition or "").lower()
+    if cond not in SCORED_CONDITIONS:
+        cond = ""
+    occ = occasion if occasion in OCCASION_PROFILES else ""
+    return (
+        temp_to_warmth_band(temp_f),
+        temp_f < OUTERWEAR_BELOW_F,
+        cond == "sunny" and temp_f >= SUNNY_HOT_F,
+        occ,
+        cond,
+    )
+
+class ScoreBreakdown(NamedTuple):
+    """
+    Per-item scores plus the parts they are made of, one float64 array
+    each (same order as catalog.items). For items with a warmth_score:
+      score = 10 - warmth_penalty + formality_bonus + activity_bonus + condition_adjustment
+    Items without one score -999.
+    """
+    scores: np.ndarray
+    warmth_penalty: np.ndarray
+    formality_bonus: np.ndarray
+    activity_bonus: np.ndarray
+    condition_adjustment: np.ndarray
+
+def score_catalog_breakdown(
+    catalog: ItemCatalog,
     temp_f: float,
     occasion: str,
     condition: Optional[str] = None,
-    limit: int = 4,
-) -> List[Item]:
-    """
-    Score items and build a more realistic outfit:
-      - Try to pick: 1 top, 1 bottom, 1 shoes
-      - Only add outerwear if it's cool/cold
-      - Fall back to best available if some category is missing
-    """
-    scored = []
-    for item in items:
-        s = score_item(item, temp_f, occasion, condition)
-        if s > 0:
-            scored.append((item, s))
+) -> ScoreBreakdown:
+    """score_catalog, keeping each item's score components from the same pass."""
+    target_warmth = temp_to_warmth_band(temp_f)
+    warmth = catalog.warmth
 
-    if not scored:
-        return []
+    profile = OCCASION_PROFILES.get(occasion, {})
+    desired_formality = profile.get("formality")
+    desired_activity = profile.get("activity")
 
-    # Group by category
-    by_cat = defaultdict(list)
-    for item, s in scored:
-        cat = (item.category or "").lower()
-        by_cat[cat].append((item, s))
+    formality_bonus = np.zeros(len(catalog))
+    if desired_formality:
+        formality = catalog.formality_codes
+        formality_bonus[formality == catalog.formality_code(desired_formality)] = 3.0
+        if desired_formality in ("casual", "business"):
+            loose = np.isin(formality, [catalog.formality_code("casual"), catalog.formality_code("business")])
+            formality_bonus[loose & (formality_bonus == 0.0)] = 1.0
 
-    # sort each category by score desc
-    for cat in by_cat:
-        by_cat[cat].sort(key=lambda x: x[1], reverse=True)
+    activity_bonus = np.zeros(len(catalog))
+    if desired_activity:
+        activity_bonus[catalog.activity_codes == catalog.activity_code(desired_activity)] = 2.0
 
-    outfit: List[Item] = []
+    # Base score (same order of operations as score_item so floats match exactly)
+    warmth_penalty = np.abs(warmth - target_warmth) * 1.2
+    scores = np.full(len(catalog), 10.0)
+    scores -= warmth_penalty
+    scores += formality_bonus
+    scores += activity_bonus
 
-    def best_from(cat_name: str):
-        lst = by_cat.get(cat_name, [])
-        return lst[0][0] if lst else None
+    # ---- Weather condition adjustment (simple) ----
+    # applied to scores step by step like score_item; the adjustments are
+    # multiples of 0.5, so summing them separately is exact
+    adjustment = np.zeros(len(catalog))
+    if condition:
+        condition = condition.lower()
+        steps = []
+        if condition == "sunny" and temp_f >= SUNNY_HOT_F:
+            steps.append((warmth >= 6, -3.0))
+        if condition == "rainy":
+            steps.append((catalog.category_codes == catalog.category_code("outerwear"), 1.5))
+            steps.append((catalog.is_boot, 2.0))
+        if condition == "snowy":
+            warm = warmth >= 7
+            steps.append((warm, 2.5))
+            steps.append((~warm, -2.0))
+        for mask, delta in steps:
+            scores[mask] += delta
+            adjustment[mask] += delta
 
-    # 1) Always try to get a top, bottom, shoes
-    top = best_from("top")
-    bottom = best_from("bottom")
-    shoes = best_from("shoes")
+    scores[~catalog.has_warmth] = -999
+    return ScoreBreakdown(scores, warmth_penalty, formality_bonus, activity_bonus, adjustment)
 
-    if top:
-        outfit.append(top)
-    if bottom:
-        outfit.append(bottom)
-    if shoes:
-        outfit.append(shoes)
+def score_catalog(
+    catalog: ItemCatalog,
+    temp_f: float,
+    occasion: str,
+    condition: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Vectorized score_item: score every item in the catalog in one pass.
+    Returns a float64 array (same order as catalog.items) whose values are
+    identical to calling score_item on each item.
+    """
+    return score_catalog_breakdown(catalog, temp_f, occasion, condition).scores
+
+def top_k_rows(scores: np.ndarray, rows: np.ndarray, k: int) -> np.ndarray:
+    """
+    The k best of `rows` (ascending row indices) by score, best first.
+    Ties keep catalog order, same as a stable sort, but only the
+    candidates at or above the k-th best score get sorted: O(n) instead
+    of O(n log n) when k is small.
+    """
+    if k <= 0 or len(rows) == 0:
+        return rows[:0]
+    if len(rows) > k:
+        vals = scores[rows]
+        kth_best = np.partition(vals, len(rows) - k)[len(rows) - k]
+        rows = rows[vals >= kth_best]
+    return rows[np.argsort(-scores[rows], kind="stable")][:k]
+
+def assemble_outfit(
+    top_rows: Callable[[Optional[str], int], List[int]],
+    ids: np.ndarray,
+    temp_f: float,
+    limit: int = 4,
+    alternatives: int = 0,
+) -> Tuple[List[int], Dict[str, List[int]]]:
+    """
+    Outfit-building policy shared by every scoring backend.
+    `top_rows(slot, k)` must return the k best rows with score > 0 in
+    that slot (or across all slots for None), best first, ties in
+    catalog order. `ids` maps rows to item ids.
+    """
+    if not top_rows(None, 1):
+        return [], {}
+
+    picks: List[int] = []
+    alts: Dict[str, List[int]] = {}
+
+    # 1) Always try to get a top, bottom, shoes
+    slots = ["top", "bottom", "shoes"]
 
     # 2) Add outerwear only if it's not very hot
-    outerwear_needed = temp_f < 65
+    outerwear_needed = temp_f < OUTERWEAR_BELOW_F
     if outerwear_needed:
-        ow = best_from("outerwear")
-        if ow:
-            outfit.append(ow)
+        slots.append("outerwear")
+
+    alternatives = max(alternatives, 0)
+    slot_best: Dict[str, List[int]] = {}
+    for slot in slots:
+        best = top_rows(slot, 1 + alternatives)
+        if best:
+            picks.append(best[0])
+            slot_best[slot] = best
 
     # 3) Fill any remaining slots with best remaining items
-    if len(outfit) < limit:
-        used_ids = {i.id for i in outfit}
-        scored.sort(key=lambda x: x[1], reverse=True)
-        for item, s in scored:
-            if item.id in used_ids:
-                continue
-            outfit.append(item)
-            used_ids.add(item.id)
-            if len(outfit) >= limit:
+    need = limit - len(picks)
+    if need > 0:
+        used_ids = {int(ids[i]) for i in picks}
+        k = limit
+        while True:
+            filled = []
+            seen = set(used_ids)
+            best = top_rows(None, k)
+            for idx in best:
+                item_id = int(ids[idx])
+                if item_id in seen:
+                    continue
+                filled.append(idx)
+                seen.add(item_id)
+                if len(filled) >= need:
+                    break
+            # duplicate ids can eat into the top k; widen and retry
+            if len(filled) >= need or len(best) < k:
                 break
+            k *= 2
+        picks.extend(filled)
+    picks = picks[:limit]
+
+    # 4) Alternatives: the slot's runners-up, minus anything already in the outfit
+    used_ids = {int(ids[i]) for i in picks}
+    for slot, best in slot_best.items():
+        rest = [i for i in best[1:] if int(ids[i]) not in used_ids]
+        if len(rest) < alternatives and len(best) > alternatives:
+            # the fill step took some of them; look further down the slot
+            best = top_rows(slot, 1 + alternatives + len(picks))
+            rest = [i for i in best[1:] if int(ids[i]) not in used_ids]
+        alts[slot] = rest[:alternatives]
+
+    return picks, alts
 
-    return outfit[:limit]
\ No newline at end of file
+def select_outfit_rows(
+    catalog: ItemCatalog,
+    temp_f: float,
+    occasion: str,
+    condition: Optional[str] = None,
+    limit: int = 4,
+    alternatives: int = 0,
+) -> Tuple[List[int], Dict[str, List[int]]]:
+    """
+    pick_outfit on row indices into catalog.items. Also returns, for each
+    outfit slot, the next `alternatives` best rows after the one picked.
+    """
+    scores = score_catalog(catalog, temp_f, occasion, condition)
+    return select_scored_rows(catalog, scores, temp_f, limit, alternatives)
+
+def select_scored_rows(
+    catalog: ItemCatalog,
+    scores: np.ndarray,
+    temp_f: float,
+    limit: int = 4,
+    alternatives: int = 0,
+) -> Tuple[List[int], Dict[str, List[int]]]:
+    """select_outfit_rows for scores the caller already has (from score_catalog)."""
+    candidates = np.flatnonzero(scores > 0)
+
+    def top_rows(slot: Optional[str], k: int) -> List[int]:
+        rows = candidates
+        if slot is not None:
+            rows = rows[catalog.slot_codes[rows] == catalog.slot_code(slot)]
+        return top_k_rows(scores, rows, k).tolist()
+
+    return assemble_outfit(top_rows, catalog.ids, temp_f, limit, alternatives)
+
+def pick_outfit_rows(
+    catalog: ItemCatalog,
+    temp_f: float,
+    occasion: str,
+    condition: Optional[str] = None,
+    limit: int = 4,
+) -> List[int]:
+    """pick_outfit, but returns row indices into catalog.items."""
+    return select_outfit_rows(catalog, temp_f, occasion, condition, limit)[0]
+
+def pick_outfit(
+    items: Union[Sequence[ItemLike], ItemCatalog],
+    temp_f: float,
+    occasion: str,
+    condition: Optional[str] = None,
+    limit: int = 4,
+) -> List[ItemLike]:
+    """
+    Score items and build a more realistic outfit:
+      - Try to pick: 1 top, 1 bottom, 1 shoes
+      - Only add outerwear if it's cool/cold
+      - Fall back to best available if some category is missing
+    Accepts a list of items or a prebuilt ItemCatalog (cheaper when the
+    same catalog is reused across requests).
+    """
+    catalog = items if isinstance(items, ItemCatalog) else ItemCatalog(items)
+    return [catalog.items[i] for i in pick_outfit_rows(catalog, temp_f, occasion, condition, limit)]
+
+def pick_outfit_with_alternatives(
+    items: Union[Sequence[ItemLike], ItemCatalog],
+    temp_f: float,
+    occasion: str,
+    condition: Optional[str] = None,
+    limit: int = 4,
+    alternatives: int = 3,
+) -> Tuple[List[ItemLike], Dict[str, List[ItemLike]]]:
+    """
+    pick_outfit plus up to `alternatives` runner-up items per slot
+    (top/bottom/shoes/outerwear), best first, so the UI can offer swaps.
+    """
+    catalog = items if isinstance(items, ItemCatalog) else ItemCatalog(items)
+    rows, alts = select_outfit_rows(catalog, temp_f, occasion, condition, limit, alternatives)
+    return (
+        [catalog.items[i] for i in rows],
+        {slot: [catalog.items[i] for i in alt_rows] for slot, alt_rows in alts.items()},
+    )
@@ -0,0 +1,28 @@
+import sys
+import os
+
+# Add parent directory to path so we can import backend modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from backend.db import SessionLocal
+from backend.catalog import ItemCatalog, current_version, load_items
+from backend.catalog_file import write_catalog_file
+
+def export_catalog(path):
+    """Write the items table to a catalog file that workers mmap (see backend/catalog_file.py)"""
+    db = SessionLocal()
+    try:
+        # version first: if items change meanwhile the file is labelled older, never newer
+        version = current_version(db)
+        catalog = ItemCatalog(load_items(db), version=version)
+    finally:
+        db.close()
+    write_catalog_file(catalog, path)
+    print(f"✅ Exported {len(catalog)} items (catalog version {version}) to {path}")
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("CATALOG_FILE")
+    if not path:
+        print("Usage: python -m backend.scripts.export_catalog <path>  (defaults to $CATALOG_FILE)")
+        sys.exit(1)
+    export_catalog(path)
@@ -0,0 +1,4 @@
+import os
+
+# backend.db needs a URL at import; nothing here touches a real database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
@@ -0,0 +1,36 @@
+from backend.catalog import ItemCatalog, ItemRecord
+from backend.catalog_index import select_outfit_rows_indexed
+from backend.rules import pick_outfit_with_alternatives, select_outfit_rows
+
+
+def _item(id, category, warmth=5):
+    return ItemRecord(id, f"{category} {id}", category, "casual", warmth, "outdoor")
+
+
+# no bottoms and it's warm (no outerwear): the fill step tops up the outfit with more tops
+CATALOG = [
+    _item(1, "top", 5),
+    _item(2, "top", 4),
+    _item(3, "top", 3),
+    _item(4, "top", 2),
+    _item(5, "shoes", 5),
+    _item(6, "shoes", 4),
+]
+
+
+def test_alternatives_exclude_items_already_in_the_outfit():
+    outfit, alts = pick_outfit_with_alternatives(CATALOG, 80, "casual_outing", alternatives=3)
+
+    picked = {i.id for i in outfit}
+    assert len(outfit) == 4
+    assert {i.category for i in outfit} == {"top", "shoes"}
+    for slot, items in alts.items():
+        assert picked.isdisjoint(i.id for i in items), slot
+    assert len(alts["shoes"]) == 1  # the other pair: nothing took it
+
+
+def test_indexed_selection_matches_scored_selection():
+    catalog = ItemCatalog(CATALOG)
+    for alternatives in (0, 1, 3):
+        assert select_outfit_rows_indexed(catalog, 80, "casual_outing", None, 4, alternatives) == \
+            select_outfit_rows(catalog, 80, "casual_outing", None, 4, alternatives)
@@ -0,0 +1,36 @@
+from unittest import mock
+
+import pytest
+import requests
+
+from backend import weather_client
+from backend.weather_client import WeatherClient
+
+
+def _client(**kwargs):
+    return WeatherClient("http://forecast.test", "http://geocode.test", **kwargs)
+
+
+def test_retries_back_off_between_attempts():
+    client = _client(retries=2, backoff=0.5)
+    with mock.patch.object(client.session, "get", side_effect=requests.exceptions.ConnectionError("down")) as get, \
+            mock.patch.object(weather_client.time, "sleep") as sleep, \
+            mock.patch.object(weather_client.random, "uniform", return_value=1.0):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.forecast({})
+
+    assert get.call_count == 3
+    # one sleep between each pair of attempts, doubling, none after the last
+    assert [c.args[0] for c in sleep.call_args_list] == [0.5, 1.0]
+
+
+def test_unexpected_error_releases_half_open_trial():
+    client = _client(breaker_threshold=1, breaker_reset=0.0)
+    breaker = client.breakers[client.forecast_url]
+    breaker.record_failure()  # open; reset_timeout 0 makes the next call the half-open trial
+
+    with mock.patch.object(client.session, "get", side_effect=KeyError("boom")):
+        with pytest.raises(KeyError):
+            client.forecast({})
+
+    assert breaker.allow()  # a new trial is let through
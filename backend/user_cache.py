@@ -0,0 +1,69 @@
+"""Per-process cache of the user + profile fields auth checks and /me read.
+
+Entries live for USER_CACHE_TTL seconds. Writes in this process call
+forget() so they show up right away; other workers pick them up when
+their entry expires, so keep the TTL short.
+"""
+
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy.orm import Session, joinedload
+
+from backend import metrics
+from backend.cache import MISS, MemoryCache
+from backend.models import User
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+_cache = MemoryCache(USER_CACHE_SIZE)
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def user_info(user: User) -> dict:
+    """The /me "user" body for a User (profile loaded or None)."""
+    profile = user.profile
+    return {
+        "id": user.id,
+        "email": user.email,
+        "role": user.role,
+        "location": profile.location_text if profile else None,
+        "units": profile.units if profile else "F",
+    }
+
+
+def get_user_info(db: Session, user_id: int) -> Optional[dict]:
+    """user_info for user_id, or None if the user doesn't exist. Misses cost one query."""
+    user_id = int(user_id)
+    info = _cache.get(str(user_id))
+    with _stats_lock:
+        _stats["hits" if info is not MISS else "misses"] += 1
+    if info is not MISS:
+        return info
+
+    user = db.query(User).options(joinedload(User.profile)).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    info = user_info(user)
+    _cache.set(str(user_id), info, USER_CACHE_TTL)
+    return info
+
+
+def remember(info: dict) -> None:
+    """Cache fresh user_info right after a write."""
+    _cache.set(str(info["id"]), info, USER_CACHE_TTL)
+
+
+def forget(user_id: int) -> None:
+    _cache.delete(str(int(user_id)))
+
+
+def stats() -> dict:
+    with _stats_lock:
+        return dict(_stats, ttl=USER_CACHE_TTL, maxsize=USER_CACHE_SIZE)
+
+
+metrics.register("user_cache", stats)
@@ -0,0 +1,103 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from backend.db import db_session
+from backend.models import Item
+
+wardrobe_bp = Blueprint("wardrobe", __name__)
+
+MAX_WARDROBE_ITEMS = 2000
+TEXT_FIELDS = {"name": 120, "category": 80, "formality": 40, "activity_comfort": 80}
+
+def _item_json(i):
+    return {
+        "id": i.id,
+        "name": i.name,
+        "category": i.category,
+        "formality": i.formality,
+        "warmth_score": i.warmth_score,
+        "activity_comfort": i.activity_comfort,
+    }
+
+def _parse_item(data, partial=False):
+    """Validated Item column values from a request body; ValueError if invalid."""
+    values = {}
+    for field, max_len in TEXT_FIELDS.items():
+        if field not in data:
+            continue
+        value = data[field]
+        if value is not None:
+            if not isinstance(value, str):
+                raise ValueError(f"{field} must be a string")
+            value = value.strip()
+            if field != "name":
+                value = value.lower()  # the rules compare these exactly ("outerwear", "casual", ...)
+            if len(value) > max_len:
+                raise ValueError(f"{field} must be at most {max_len} characters")
+        values[field] = value or None
+    if "warmth_score" in data:
+        warmth = data["warmth_score"]
+        if warmth is not None and (isinstance(warmth, bool) or not isinstance(warmth, int) or not 1 <= warmth <= 10):
+            raise ValueError("warmth_score must be an integer from 1 to 10")
+        values["warmth_score"] = warmth
+    if (not partial or "name" in values) and not values.get("name"):
+        raise ValueError("name is required")
+    return values
+
+def _owned_item(db, item_id):
+    return db.query(Item).filter_by(id=item_id, owner_id=int(get_jwt_identity())).first()
+
+@wardrobe_bp.get("/wardrobe")
+@jwt_required()
+def list_wardrobe():
+    """The caller's own items (recommendations pick from these plus the global catalog)"""
+    db = db_session()
+    items = db.query(Item).filter_by(owner_id=int(get_jwt_identity())).order_by(Item.id).all()
+    return jsonify({"items": [_item_json(i) for i in items]}), 200
+
+@wardrobe_bp.post("/wardrobe")
+@jwt_required()
+def add_wardrobe_item():
+    data = request.get_json(force=True) or {}
+    try:
+        values = _parse_item(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    user_id = int(get_jwt_identity())
+    db = db_session()
+    if db.query(Item).filter_by(owner_id=user_id).count() >= MAX_WARDROBE_ITEMS:
+        return jsonify({"error": f"a wardrobe holds at most {MAX_WARDROBE_ITEMS} items"}), 400
+    item = Item(owner_id=user_id, **values)
+    db.add(item)
+    db.commit()
+    return jsonify({"item": _item_json(item)}), 201
+
+@wardrobe_bp.patch("/wardrobe/<int:item_id>")
+@jwt_required()
+def update_wardrobe_item(item_id):
+    data = request.get_json(force=True) or {}
+    try:
+        values = _parse_item(data, partial=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    db = db_session()
+    item = _owned_item(db, item_id)
+    if not item:
+        return jsonify({"error": "Item not found"}), 404
+    for field, value in values.items():
+        setattr(item, field, value)
+    db.commit()
+    return jsonify({"item": _item_json(item)}), 200
+
+@wardrobe_bp.delete("/wardrobe/<int:item_id>")
+@jwt_required()
+def delete_wardrobe_item(item_id):
+    db = db_session()
+    item = _owned_item(db, item_id)
+    if not item:
+        return jsonify({"error": "Item not found"}), 404
+    db.delete(item)
+    db.commit()
+    return jsonify({"message": "Item deleted"}), 200
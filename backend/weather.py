@@ -0,0 +1,238 @@
+"""Open-Meteo forecast + geocoding helpers used by the weather routes."""
+
+import calendar
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+import requests
+
+from backend.cache import MISS, SingleFlight, cache_from_url
+from backend.weather_client import WeatherClient
+
+logger = logging.getLogger(__name__)
+
+# overridable so tests / local dev can point at a stub server
+OPEN_METEO_BASE = os.getenv("OPEN_METEO_BASE", "https://api.open-meteo.com/v1/forecast")
+OPEN_METEO_GEOCODE = os.getenv("OPEN_METEO_GEOCODE", "https://geocoding-api.open-meteo.com/v1/search")
+
+client = WeatherClient(
+    OPEN_METEO_BASE,
+    OPEN_METEO_GEOCODE,
+    timeout=(3.05, float(os.getenv("WEATHER_TIMEOUT", "8"))),
+    retries=int(os.getenv("WEATHER_RETRIES", "2")),
+    pool_size=int(os.getenv("WEATHER_POOL_SIZE", "20")),
+    breaker_threshold=int(os.getenv("WEATHER_BREAKER_THRESHOLD", "5")),
+    breaker_reset=float(os.getenv("WEATHER_BREAKER_RESET", "30")),
+)
+
+# City -> coordinates basically never changes, so cache it for a long time.
+# GEOCODE_CACHE is "memory" (per process) or "sqlite:///path/file.db" (shared by workers on a host)
+GEOCODE_TTL = float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", "3600"))
+# 4 decimals is ~11m: plenty for weather, and keeps cached/stored coordinates tidy
+GEOCODE_COORD_DECIMALS = int(os.getenv("GEOCODE_COORD_DECIMALS", "4"))
+_geocode_cache = cache_from_url(
+    os.getenv("GEOCODE_CACHE", "memory"),
+    maxsize=int(os.getenv("GEOCODE_CACHE_SIZE", "4096")),
+    table="geocode",
+)
+
+# Forecasts are cached per grid cell (0.1 deg is ~11km), so everyone in
+# a metro shares one upstream call. Entries live until the model's next
+# update (see _forecast_ttl). FORECAST_CACHE takes the same values as GEOCODE_CACHE.
+FORECAST_GRID_DEG = float(os.getenv("FORECAST_GRID_DEG", "0.1"))
+FORECAST_MIN_TTL = 60
+FORECAST_MAX_TTL = float(os.getenv("FORECAST_MAX_TTL", "3600"))
+_forecast_cache = cache_from_url(
+    os.getenv("FORECAST_CACHE", "memory"),
+    maxsize=int(os.getenv("FORECAST_CACHE_SIZE", "4096")),
+    table="forecast",
+)
+_forecast_flight = SingleFlight()
+
+def grid_cell(lat, lon):
+    """Center of the FORECAST_GRID_DEG cell containing (lat, lon)."""
+    g = FORECAST_GRID_DEG
+    return round(round(float(lat) / g) * g, 4), round(round(float(lon) / g) * g, 4)
+
+def _forecast_ttl(data, now=None):
+    """Seconds until upstream publishes newer data than this response."""
+    now = time.time() if now is None else now
+    current = data.get("current") or {}
+    if current.get("time") and current.get("interval"):
+        # current.time is local to the response's timezone; undo the offset to get UTC
+        local = calendar.timegm(datetime.fromisoformat(current["time"]).timetuple())
+        next_update = local - data.get("utc_offset_seconds", 0) + current["interval"]
+    else:
+        # hourly/daily series refresh with the hourly model runs
+        next_update = (now // 3600 + 1) * 3600
+    return min(max(next_update - now, FORECAST_MIN_TTL), FORECAST_MAX_TTL)
+
+def forecast_request(lat, lon, params):
+    """(upstream params, cache key) for a forecast of the grid cell containing (lat, lon)."""
+    cell_lat, cell_lon = grid_cell(lat, lon)
+    params = {**params, "latitude": cell_lat, "longitude": cell_lon}
+    return params, json.dumps(params, sort_keys=True)
+
+def cached_forecast(key, allow_stale=False):
+    return _forecast_cache.get(key, allow_stale=allow_stale)
+
+def store_forecast(key, data):
+    _forecast_cache.set(key, data, _forecast_ttl(data))
+
+def fetch_forecast(lat, lon, params):
+    """
+    Forecast JSON for the grid cell containing (lat, lon). Cached per
+    (cell, params), and concurrent misses for the same key share one
+    upstream request. Don't mutate the result: it's shared.
+    """
+    params, key = forecast_request(lat, lon, params)
+
+    data = cached_forecast(key)
+    if data is not MISS:
+        return data
+
+    def load():
+        data = cached_forecast(key)  # filled while we waited for the flight?
+        if data is not MISS:
+            return data
+        try:
+            data = client.forecast(params)
+        except requests.exceptions.RequestException:
+            # upstream down (or breaker open): an expired forecast beats an error
+            data = cached_forecast(key, allow_stale=True)
+            if data is MISS:
+                raise
+            return data
+        store_forecast(key, data)
+        return data
+
+    return _forecast_flight.do(key, load)
+
+def hourly_params(hourly, units, timezone, **extra):
+    params = {"hourly": hourly, "timezone": timezone, **extra}
+    if units == "fahrenheit":
+        params["temperature_unit"] = "fahrenheit"
+    return params
+
+def request_from_api(lat, lon, hourly, units, timezone, **extra):
+    # shallow copy: callers add keys like _resolved_location
+    return dict(fetch_forecast(lat, lon, hourly_params(hourly, units, timezone, **extra)))
+
+def current_temp_params(units, timezone):
+    params = {
+        "current": "temperature_2m,weather_code",
+        "daily": "temperature_2m_max,temperature_2m_min",
+        "timezone": timezone
+    }
+    # Convert single letter to full unit name
+    if units == "f":
+        params["temperature_unit"] = "fahrenheit"
+    elif units == "c":
+        params["temperature_unit"] = "celsius"
+    return params
+
+def parse_current_temp(data):
+    """(temp, temp_unit, high, low) from a current + daily forecast response."""
+    logger.debug("current weather response: %s", data)
+    current_data = data.get("current", {})
+    daily_data = data.get("daily", {})
+    temp = current_data.get("temperature_2m")
+    # Get the actual unit returned by the API
+    temp_unit = data.get("current_units", {}).get("temperature_2m", "°C")
+    # Get today's high and low (first element of daily arrays)
+    high = daily_data.get("temperature_2m_max", [None])[0]
+    low = daily_data.get("temperature_2m_min", [None])[0]
+    return temp, temp_unit, high, low
+
+def get_current_temp(lat, lon, units, timezone):
+    """Get current temperature and daily high/low using the forecast endpoint"""
+    try:
+        # Use the forecast endpoint with current and daily parameters
+        return parse_current_temp(fetch_forecast(lat, lon, current_temp_params(units, timezone)))
+    except Exception as e:
+        logger.warning("error fetching current temp: %s", e)
+        raise
+
+def geocode_request(city, country=None, state=None, count=5):
+    """(upstream params, cache key). The key ignores case and extra whitespace."""
+    params = {"name": city, "count": count, "format": "json", "language": "en"}
+    if country: params["country"] = country
+    if state: params["admin1"] = state
+
+    def norm(v):
+        return " ".join((v or "").split()).lower()
+    return params, json.dumps([norm(city), norm(country), norm(state)])
+
+def cached_geocode(key, allow_stale=False):
+    return _geocode_cache.get(key, allow_stale=allow_stale)
+
+def store_geocode(key, best):
+    # "not found" is cached too, just for less time
+    _geocode_cache.set(key, best, GEOCODE_TTL if best else GEOCODE_NEGATIVE_TTL)
+
+def best_match(data):
+    """First geocoding result, coordinates rounded to GEOCODE_COORD_DECIMALS (or None)."""
+    results = (data or {}).get("results") or []
+    if not results:
+        return None
+    best = dict(results[0])
+    for k in ("latitude", "longitude"):
+        if best.get(k) is not None:
+            best[k] = round(float(best[k]), GEOCODE_COORD_DECIMALS)
+    return best
+
+def geocode(city, country=None, state=None, count=5):
+    """Best geocoding match for a city (or None), cached by normalized (city, country, state)."""
+    params, key = geocode_request(city, country, state, count)
+    best = cached_geocode(key)
+    if best is not MISS:
+        return best
+    try:
+        best = best_match(client.geocode(params))
+    except requests.exceptions.RequestException:
+        best = cached_geocode(key, allow_stale=True)
+        if best is MISS:
+            raise
+        return best
+    store_geocode(key, best)
+    return best
+
+def store_resolved_location(profile, best):
+    """Copy a geocoding result onto the profile's coordinate columns."""
+    profile.latitude = best["latitude"]
+    profile.longitude = best["longitude"]
+    profile.timezone = best.get("timezone")
+    profile.resolved_location = {
+        "name": best.get("name"),
+        "latitude": best["latitude"],
+        "longitude": best["longitude"],
+        "country": best.get("country"),
+        "admin1": best.get("admin1"),
+        "timezone": best.get("timezone"),
+    }
+
+def geocode_location(location_text):
+    """
+    Geocoding result for a profile's saved location, or None if it's
+    empty, unknown, or upstream is down (the coordinates then get filled
+    on next use). Can wait on upstream for a while, so call it outside
+    any open DB transaction.
+    """
+    location = (location_text or "").strip()
+    if not location:
+        return None
+    try:
+        return geocode(location)
+    except requests.exceptions.RequestException as e:
+        logger.warning("could not geocode %r: %s", location, e)
+        return None
+
+def apply_resolved_location(profile, best):
+    """Store a geocode_location() result on the profile, clearing the columns if it's None."""
+    profile.latitude = profile.longitude = profile.timezone = profile.resolved_location = None
+    if best:
+        store_resolved_location(profile, best)
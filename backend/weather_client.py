@@ -0,0 +1,139 @@
+"""HTTP client for the Open-Meteo APIs.
+
+One pooled requests.Session per process (keep-alive instead of a new
+TCP+TLS handshake per call), a few retries with jittered exponential
+backoff for transient failures, and a circuit breaker per upstream so a
+slow or down API fails fast instead of pinning workers for the full
+timeout. Base URLs are plain constructor arguments, so the client can be
+pointed at a local stub server.
+"""
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without calling upstream while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures.
+    open -> half-open after `reset_timeout` seconds: one trial call is let
+    through; success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+def _retryable(e: Exception) -> bool:
+    if isinstance(e, requests.exceptions.HTTPError):
+        status = getattr(e.response, "status_code", None)
+        return status is not None and (status >= 500 or status == 429)
+    return isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+class WeatherClient:
+    def __init__(
+        self,
+        forecast_url: str,
+        geocode_url: str,
+        timeout=(3.05, 8),
+        retries: int = 2,
+        backoff: float = 0.2,
+        pool_size: int = 20,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+    ):
+        self.forecast_url = forecast_url
+        self.geocode_url = geocode_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.breakers = {
+            forecast_url: CircuitBreaker(breaker_threshold, breaker_reset),
+            geocode_url: CircuitBreaker(breaker_threshold, breaker_reset),
+        }
+
+    def get_json(self, url: str, params: dict):
+        """
+        GET url and return its JSON. Connection errors, timeouts, 5xx and
+        429 are retried; other 4xx are raised right away and don't count
+        against the breaker.
+        """
+        breaker = self.breakers.setdefault(url, CircuitBreaker())
+        if not breaker.allow():
+            raise CircuitOpenError(f"circuit open for {url}")
+
+        for attempt in range(self.retries + 1):
+            try:
+                r = self.session.get(url, params=params, timeout=self.timeout)
+                r.raise_for_status()
+                data = r.json()
+            except requests.exceptions.RequestException as e:
+                if not _retryable(e):
+                    breaker.record_success()  # upstream answered; the request was bad
+                    raise
+                if attempt == self.retries:
+                    breaker.record_failure()
+                    raise
+                # exponential backoff with jitter so retries from many workers don't sync up
+                time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+            except BaseException:
+                breaker.record_failure()  # never leave a half-open trial marked as running
+                raise
+            else:
+                breaker.record_success()
+                return data
+
+    def forecast(self, params: dict):
+        return self.get_json(self.forecast_url, params)
+
+    def geocode(self, params: dict):
+        return self.get_json(self.geocode_url, params)
@@ -1,10 +1,16 @@
 import { getToken } from "../authStore";
 
-export async function apiGetUsers() {
+// One page of users: { users, next_after_id }. Pass next_after_id back as afterId for the next page.
+export async function apiGetUsers({ afterId, q } = {}) {
   const token = getToken();
   if (!token) throw new Error("Not logged in");
 
-  const res = await fetch("/api/admin/users", {
+  const params = new URLSearchParams();
+  if (afterId) params.set("after_id", afterId);
+  if (q) params.set("q", q);
+  const query = params.toString();
+
+  const res = await fetch(`/api/admin/users${query ? `?${query}` : ""}`, {
     method: "GET",
     headers: { "Authorization": `Bearer ${token}` },
   });
@@ -16,6 +16,8 @@ const CONDITIONS = {
   snowy: "Snowy",
 };
 
+const PAGE_SIZE = 100; // ranked items fetched per page
+
 const SCORE_THRESHOLDS = {
   excellent: 10,
   good: 5,
@@ -31,10 +33,11 @@ export default function RuleEngineDebugger() {
   const [sortBy, setSortBy] = useState("score");
   const [sortOrder, setSortOrder] = useState("desc");
 
-  const testOutfitScoring = async () => {
+  // offset 0 runs a new test; a later offset appends the next page of the ranking
+  const testOutfitScoring = async (offset = 0) => {
     setLoading(true);
     setError("");
-    setResults(null);
+    if (offset === 0) setResults(null);
 
     try {
       const token = getToken();
@@ -54,6 +57,8 @@ export default function RuleEngineDebugger() {
             temp_f: parseFloat(tempF),
             occasion,
             condition: condition || null,
+            offset,
+            limit: PAGE_SIZE,
           }),
         }
       );
@@ -62,7 +67,12 @@ export default function RuleEngineDebugger() {
         throw new Error(`Error: ${response.statusText}`);
       }
 
-      setResults(await response.json());
+      const data = await response.json();
+      setResults((prev) =>
+        offset === 0 || !prev
+          ? data
+          : { ...data, all_items_scored: [...prev.all_items_scored, ...data.all_items_scored] }
+      );
     } catch (err) {
       setError(err.message);
     } finally {
@@ -85,6 +95,17 @@ export default function RuleEngineDebugger() {
     });
   };
 
+  const describeBreakdown = (b) => {
+    if (!b) return "No warmth score";
+    return [
+      `Base 10`,
+      `Warmth −${b.warmth_penalty.toFixed(1)}`,
+      `Style +${b.formality_bonus.toFixed(1)}`,
+      `Activity +${b.activity_bonus.toFixed(1)}`,
+      `Weather ${b.condition_adjustment >= 0 ? "+" : ""}${b.condition_adjustment.toFixed(1)}`,
+    ].join("\n");
+  };
+
   const getScoreColor = (score) => {
     if (score >= SCORE_THRESHOLDS.excellent) return "#10b981";
     if (score >= SCORE_THRESHOLDS.good) return "#f59e0b";
@@ -141,7 +162,7 @@ export default function RuleEngineDebugger() {
           </select>
         </div>
 
-        <button className="btn-test" onClick={testOutfitScoring} disabled={loading}>
+        <button className="btn-test" onClick={() => testOutfitScoring(0)} disabled={loading}>
           {loading ? "Testing..." : "Test"}
         </button>
       </div>
@@ -174,6 +195,7 @@ export default function RuleEngineDebugger() {
                   <div
                     className="pick-score"
                     style={{ backgroundColor: getScoreColor(item.score) }}
+                    title={describeBreakdown(item.breakdown)}
                   >
                     <div className="score-value">{item.score.toFixed(1)}</div>
                     <div className="score-label">{getScoreLabel(item.score)}</div>
@@ -190,7 +212,9 @@ export default function RuleEngineDebugger() {
           {/* All Items Table */}
           <div className="all-items">
             <div className="section-header">
-              <h3>All Items Ranked ({results.all_items_scored.length})</h3>
+              <h3>
+                All Items Ranked ({results.all_items_scored.length} of {results.total_items})
+              </h3>
               <div className="sorting">
                 <select value={sortBy} onChange={(e) => setSortBy(e.target.value)}>
                   <option value="score">Sort: Score</option>
@@ -224,6 +248,7 @@ export default function RuleEngineDebugger() {
                       <span
                         className="score-badge"
                         style={{ backgroundColor: getScoreColor(item.score) }}
+                        title={describeBreakdown(item.breakdown)}
                       >
                         {item.score.toFixed(1)}
                       </span>
@@ -235,6 +260,15 @@ export default function RuleEngineDebugger() {
                 ))}
               </tbody>
             </table>
+            {results.next_offset !== null && (
+              <button
+                className="btn-test btn-more"
+                onClick={() => testOutfitScoring(results.next_offset)}
+                disabled={loading}
+              >
+                {loading ? "Loading..." : "Show more"}
+              </button>
+            )}
           </div>
         </div>
       )}
@@ -11,6 +11,8 @@ export default function AdminDashboard() {
   const navigate = useNavigate();
   const [me, setMe] = useState(null);
   const [users, setUsers] = useState([]);
+  const [nextAfterId, setNextAfterId] = useState(null);
+  const [search, setSearch] = useState("");
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
   const [deleteConfirm, setDeleteConfirm] = useState(null);
@@ -39,8 +41,24 @@ export default function AdminDashboard() {
     setLoading(true);
     setError("");
     try {
-      const data = await apiGetUsers();
+      const data = await apiGetUsers({ q: search.trim() });
       setUsers(data.users);
+      setNextAfterId(data.next_after_id);
+    } catch (err) {
+      console.error("Error loading users:", err);
+      setError(err.message);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const loadMoreUsers = async () => {
+    setLoading(true);
+    setError("");
+    try {
+      const data = await apiGetUsers({ afterId: nextAfterId, q: search.trim() });
+      setUsers((prev) => [...prev, ...data.users]);
+      setNextAfterId(data.next_after_id);
     } catch (err) {
       console.error("Error loading users:", err);
       setError(err.message);
@@ -100,6 +118,20 @@ export default function AdminDashboard() {
         <div className="users-section">
           <div className="section-header">
             <h2>User Management</h2>
+            <form
+              className="user-search"
+              onSubmit={(e) => {
+                e.preventDefault();
+                loadUsers();
+              }}
+            >
+              <input
+                type="search"
+                placeholder="Search by email…"
+                value={search}
+                onChange={(e) => setSearch(e.target.value)}
+              />
+            </form>
             <button 
               className="refresh-btn"
               onClick={loadUsers}
@@ -110,7 +142,7 @@ export default function AdminDashboard() {
           </div>
 
           <div className="users-table-container">
-            {loading ? (
+            {loading && users.length === 0 ? (
               <p className="loading">Loading users...</p>
             ) : users.length === 0 ? (
               <p className="empty">No users found</p>
@@ -154,6 +186,15 @@ export default function AdminDashboard() {
                 </tbody>
               </table>
             )}
+            {nextAfterId && (
+              <button
+                className="refresh-btn load-more-btn"
+                onClick={loadMoreUsers}
+                disabled={loading}
+              >
+                {loading ? "Loading..." : "Load more"}
+              </button>
+            )}
           </div>
         </div>
       </div>